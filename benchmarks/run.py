@@ -0,0 +1,359 @@
+"""Benchmark the hot paths of the tool against a local stand-in server.
+
+Run from the repository root, with the package installed:
+
+    python benchmarks/run.py --output results.json --baseline baseline.json
+
+The results are saved as JSON. If a baseline is given, the exit code is
+non-zero when the median time of any benchmark has regressed by more than
+the tolerance.
+"""
+from argparse import ArgumentParser
+from collections.abc import Callable
+from contextlib import redirect_stdout
+from io import StringIO
+from json import dump, load
+from os import chdir, environ
+from pathlib import Path
+from platform import python_version
+from shutil import rmtree
+from statistics import median
+from subprocess import run
+from sys import executable, path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any
+
+path.insert(0, str(Path(__file__).parent))
+
+from server import FakeServer, page  # noqa: E402
+
+# the year used by the benchmarks
+YEAR = 2016
+
+# a benchmark setup prepares a repetition and returns the function to be timed
+Setup = Callable[[], Callable[[], object]]
+
+# registered benchmarks, as name -> (setup, repeat)
+_benchmarks: dict[str, tuple[Setup, int]] = {}
+
+
+def benchmark(name: str, repeat: int = 5) -> Callable[[Setup], Setup]:
+    """Register a benchmark.
+
+    Args:
+        name (str): the benchmark name
+        repeat (int): the number of repetitions
+
+    Returns:
+        Callable[[Setup], Setup]: the decorator
+    """
+
+    def decorator(setup: Setup) -> Setup:
+        _benchmarks[name] = (setup, repeat)
+        return setup
+
+    return decorator
+
+
+@benchmark("cli_startup", repeat=10)
+def _cli_startup() -> Callable[[], object]:
+    return lambda: run(
+        [executable, "-m", "advent.cli", "--version"],
+        check=True,
+        capture_output=True,
+    )
+
+
+@benchmark("cache_year", repeat=3)
+def _cache_year() -> Callable[[], object]:
+    from argparse import Namespace
+
+    from advent.cli import cache_command
+    from advent.lib.config import settings
+    from advent.lib.puzzle import get_puzzle
+
+    rmtree(settings.cache_path, ignore_errors=True)
+    get_puzzle.cache_clear()
+
+    def function() -> None:
+        with redirect_stdout(StringIO()):
+            cache_command(Namespace(year=YEAR))
+
+    return function
+
+
+@benchmark("puzzle_parse", repeat=20)
+def _puzzle_parse() -> Callable[[], object]:
+    from advent.lib.puzzle import Puzzle
+
+    puzzle = Puzzle(YEAR, 1)
+    puzzle.preload(page(YEAR, 1))
+    return lambda: (
+        puzzle.title,
+        puzzle.descriptions,
+        puzzle.answers,
+        puzzle.submitted,
+    )
+
+
+def _save_submissions(day: int, count: int) -> None:
+    """Save synthetic submitted answers in the cache.
+
+    Args:
+        day (int): the day
+        count (int): the number of submissions
+    """
+    from advent.lib.config import settings
+    from advent.lib.filename import encode
+    from server import _ANSWER
+
+    folder = settings.cache_path / f"default/{YEAR}/{day:02}/answer/1"
+    if not folder.exists():
+        folder.mkdir(parents=True)
+        for answer in range(count):
+            with (folder / f"{encode(str(answer))}.html").open("w") as file:
+                file.write(_ANSWER.format(direction="high" if answer % 2 else "low"))
+
+
+@benchmark("lookup_answers", repeat=10)
+def _lookup_answers() -> Callable[[], object]:
+    from advent.lib.cache import lookup_answers
+    from advent.lib.part import PART_ONE
+
+    _save_submissions(2, 500)
+    return lambda: lookup_answers(YEAR, 2, PART_ONE)
+
+
+@benchmark("submitted", repeat=5)
+def _submitted() -> Callable[[], object]:
+    from advent.lib.puzzle import Puzzle
+
+    _save_submissions(2, 500)
+    puzzle = Puzzle(YEAR, 2)
+    return lambda: puzzle.submitted
+
+
+@benchmark("limiter", repeat=5)
+def _limiter() -> Callable[[], object]:
+    from pyrate_limiter.abstracts.rate import Duration
+    from pyrate_limiter.limiter import Limiter
+
+    limiter = Limiter(
+        _fast_bucket(Path(".advent-tool/limiter.sqlite")), max_delay=Duration.MINUTE
+    )
+    return lambda: [limiter.try_acquire("benchmark") for _ in range(1000)]
+
+
+def _cached_numbers(day: int) -> list[int]:
+    """Read the numbers in a cached puzzle input.
+
+    Args:
+        day (int): the day
+
+    Returns:
+        list[int]: the numbers
+    """
+    from advent.lib.puzzle import get_puzzle
+
+    return [int(line) for line in get_puzzle(YEAR, day).input_file.splitlines()]
+
+
+@benchmark("interval_set", repeat=10)
+def _interval_set() -> Callable[[], object]:
+    from advent.lib.ranges import IntervalSet
+
+    numbers = _cached_numbers(3)
+    intervals = [(x, x + 50 + x % 500) for x in numbers]
+    shifted = [(x + 25, x + 75) for x in numbers]
+
+    def function() -> None:
+        first, second = IntervalSet(intervals), IntervalSet(shifted)
+        _ = first | second, first & second, first - second
+        _ = [x in first for x in numbers]
+
+    return function
+
+
+@benchmark("range_map", repeat=10)
+def _range_map() -> Callable[[], object]:
+    from advent.lib.ranges import IntervalSet, RangeMap
+
+    numbers = sorted(set(_cached_numbers(4)))
+    # seven layers of pieces, like the seed maps, with gaps between them
+    layers = [
+        RangeMap(
+            (start, stop - 10, layer * 1000 - start % 777)
+            for start, stop in zip(numbers[layer::7], numbers[layer + 7 :: 7])
+        )
+        for layer in range(7)
+    ]
+    seeds = IntervalSet((x, x + 100) for x in numbers[::5])
+
+    def function() -> None:
+        ranges = seeds
+        for layer in layers:
+            ranges = layer.image(ranges)
+
+    return function
+
+
+@benchmark("box_set", repeat=5)
+def _box_set() -> Callable[[], object]:
+    from advent.lib.ranges import BoxSet
+
+    numbers = _cached_numbers(5)
+    # on and off cuboids, like reactor reboot steps
+    steps = [
+        (
+            index % 3 != 2,
+            tuple(
+                (x % 1000, x % 1000 + 1 + y % 200) for x, y in [(a, b), (b, c), (c, a)]
+            ),
+        )
+        for index, (a, b, c) in enumerate(
+            zip(numbers[::3], numbers[1::3], numbers[2::3])
+        )
+    ][:150]
+
+    def function() -> None:
+        cubes = BoxSet()
+        for on, box in steps:
+            cubes = cubes | BoxSet([box]) if on else cubes - BoxSet([box])
+        _ = cubes.volume
+
+    return function
+
+
+def _fast_bucket(database: Path) -> Any:  # noqa: ANN401
+    """Create an SQLite bucket, like the tool's, with a very high rate.
+
+    Args:
+        database (Path): the SQLite database
+
+    Returns:
+        Any: the bucket
+    """
+    from sqlite3 import connect
+
+    from pyrate_limiter.abstracts.rate import Duration, Rate
+    from pyrate_limiter.buckets.sqlite_bucket import Queries, SQLiteBucket
+
+    connection = connect(database, isolation_level="EXCLUSIVE", check_same_thread=False)
+    connection.cursor().execute(Queries.CREATE_BUCKET_TABLE.format(table="bench"))
+    return SQLiteBucket([Rate(10**9, Duration.SECOND)], connection, "bench")
+
+
+def _prepare(root: str) -> None:
+    """Configure the tool to use the fake server, in the current directory.
+
+    Args:
+        root (str): the root URL of the fake server
+    """
+    with Path(".advent-tool.toml").open("w") as file:
+        file.write(f'[http]\nroot = "{root}"\n\n[template]\nenabled = false\n')
+        # the metrics are saved on exit, after the directory is removed
+        file.write("\n[metrics]\nenabled = false\n")
+        # keep the machine-wide store in the temporary directory
+        file.write(f'\n[cache]\npath = "{Path("shared").resolve().as_posix()}"\n')
+    Path(".advent-tool").mkdir()
+    environ["AOC_SESSION"] = "benchmark"
+
+    # lift the rate limit, which only applies to the real website
+    from pyrate_limiter.abstracts.rate import Duration
+    from pyrate_limiter.limiter import Limiter
+
+    import advent.lib.http
+
+    bucket = _fast_bucket(Path(".advent-tool/fast.sqlite"))
+    advent.lib.http._bucket = bucket  # noqa: SLF001
+    advent.lib.http.limiter = Limiter(bucket, max_delay=Duration.MINUTE)
+
+
+def _run(names: list[str]) -> dict[str, dict[str, float]]:
+    """Run the benchmarks.
+
+    Args:
+        names (list[str]): the benchmarks to run
+
+    Returns:
+        dict[str, dict[str, float]]: the timings, in seconds, for each benchmark
+    """
+    results = {}
+    for name in names:
+        setup, repeat = _benchmarks[name]
+        times = []
+        for _ in range(repeat):
+            function = setup()
+            start = perf_counter()
+            function()
+            times.append(perf_counter() - start)
+        results[name] = {
+            "min": min(times),
+            "median": median(times),
+            "repeat": repeat,
+        }
+        print(f"{name:20} median {results[name]['median'] * 1000:10.3f} ms")
+    return results
+
+
+def _compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> bool:
+    """Compare the results against a baseline.
+
+    Args:
+        results (dict[str, dict[str, float]]): the new results
+        baseline (dict[str, dict[str, float]]): the baseline results
+        tolerance (float): the allowed slowdown, as a fraction
+
+    Returns:
+        bool: True if no benchmark has regressed
+    """
+    passed = True
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result["median"] / baseline[name]["median"]
+            regressed = ratio > 1 + tolerance
+            passed = passed and not regressed
+            print(f"{name:20} {ratio:6.2f}x {'REGRESSED' if regressed else 'ok'}")
+    return passed
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help="the benchmarks to run")
+    parser.add_argument("--output", "-o", help="save the results as JSON")
+    parser.add_argument("--baseline", "-b", help="compare against saved results")
+    parser.add_argument(
+        "--tolerance",
+        "-t",
+        type=float,
+        default=0.25,
+        help="allowed slowdown against the baseline (default 0.25)",
+    )
+    args = parser.parse_args()
+    names = args.names or list(_benchmarks)
+    output = Path(args.output).resolve() if args.output else None
+    baseline = Path(args.baseline).resolve() if args.baseline else None
+
+    with TemporaryDirectory() as directory, FakeServer() as server:
+        chdir(directory)
+        _prepare(server.root)
+        results = _run(names)
+
+    if output:
+        with output.open("w") as file:
+            dump({"python": python_version(), "results": results}, file, indent=2)
+
+    if baseline:
+        with baseline.open() as file:
+            if not _compare(results, load(file)["results"], args.tolerance):
+                raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
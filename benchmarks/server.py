@@ -0,0 +1,222 @@
+"""Local stand-in for the Advent of Code website, serving synthetic content."""
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from re import fullmatch
+from threading import Thread
+from types import TracebackType
+from typing import cast
+from urllib.parse import parse_qs
+
+_PAGE = """<!DOCTYPE html>
+<html lang="en-us">
+<head><title>Day {day} - Advent of Code {year}</title></head>
+<body>
+<header><h1 class="title-global"><a href="/">Advent of Code</a></h1></header>
+<main>
+<article class="day-desc"><h2>--- Day {day}: Synthetic Puzzle {day} ---</h2>
+{paragraphs}
+<p>For example, suppose you have the following list:</p>
+<pre><code>{example}</code></pre>
+<p>In this example, the total is <code><em>{answer}</em></code>.</p>
+<p>What is the total for your list?</p>
+</article>
+<p>Your puzzle answer was <code>{answer}</code>.</p>
+<article class="day-desc"><h2 id="part2">--- Part Two ---</h2>
+{paragraphs}
+<p>In this example, the new total is <code><em>{answer2}</em></code>.</p>
+</article>
+<p>Your puzzle answer was <code>{answer2}</code>.</p>
+<p>Both parts of this puzzle are complete! They provide two gold stars: **</p>
+</main>
+</body>
+</html>
+"""
+
+_PARAGRAPH = (
+    "<p>The <em>Elves</em> need your help with the <code>synthetic</code> "
+    "puzzle. Each line of the list contains a number, and some of the "
+    "numbers are <a href='/{year}/day/{day}'>special</a>.</p>"
+)
+
+_ANSWER = """<!DOCTYPE html>
+<html lang="en-us">
+<body><main><article><p>That's not the right answer; your answer is too
+{direction}. If you're stuck, make sure you're using the full input data.
+Please wait one minute before trying again.</p></article></main></body>
+</html>
+"""
+
+
+def page(year: int, day: int) -> str:
+    """Create a synthetic puzzle page, similar in size to the real ones.
+
+    Args:
+        year (int): the year
+        day (int): the day
+
+    Returns:
+        str: the html page
+    """
+    example = "\n".join(str(x * day) for x in range(1, 11))
+    return _PAGE.format(
+        year=year,
+        day=day,
+        paragraphs="\n".join([_PARAGRAPH.format(year=year, day=day)] * 20),
+        example=example,
+        answer=sum(x * day for x in range(1, 11)),
+        answer2=day * 1000,
+    )
+
+
+def puzzle_input(year: int, day: int) -> str:
+    """Create a synthetic puzzle input.
+
+    Args:
+        year (int): the year
+        day (int): the day
+
+    Returns:
+        str: the input
+    """
+    return "\n".join(str((x * 7919 + year * day) % 100_000) for x in range(2000))
+
+
+def calendar(year: int) -> str:
+    """Create a synthetic calendar page, with every star collected.
+
+    Args:
+        year (int): the year
+
+    Returns:
+        str: the html page
+    """
+    days = "\n".join(
+        f'<a aria-label="Day {day}, two stars" href="/{year}/day/{day}" '
+        f'class="calendar-day{day} calendar-verycomplete">Day {day}</a>'
+        for day in range(1, 26)
+    )
+    return f'<html><body><main><pre class="calendar">{days}</pre></main></body></html>'
+
+
+def leaderboard(members: int, days: int = 25) -> str:
+    """Create a synthetic private leaderboard.
+
+    Args:
+        members (int): the number of members
+        days (int): the number of days every member has both stars for
+
+    Returns:
+        str: the leaderboard JSON
+    """
+    return dumps(
+        {
+            "members": {
+                str(member): {
+                    "id": member,
+                    "name": f"member {member}",
+                    "local_score": member * 10 + days,
+                    "stars": days * 2,
+                    "last_star_ts": 1_700_000_000 + member + days,
+                    "completion_day_level": {
+                        str(day): {
+                            "1": {"get_star_ts": 1_700_000_000, "star_index": 1},
+                            "2": {"get_star_ts": 1_700_000_000, "star_index": 2},
+                        }
+                        for day in range(1, days + 1)
+                    },
+                }
+                for member in range(members)
+            }
+        }
+    )
+
+
+class _Server(ThreadingHTTPServer):
+    """The HTTP server, holding the state of the stand-in website."""
+
+    def __init__(self) -> None:
+        """Initializer."""
+        super().__init__(("127.0.0.1", 0), _Handler)
+        # the paths requested, in order
+        self.requests: list[str] = []
+        # the size and progress of the private leaderboards
+        self.members = 200
+        self.days = 25
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler for the fake server."""
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        """Silence the request log."""
+
+    def _send(self, body: str, status: int = 200, etag: str | None = None) -> None:
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(data)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_leaderboard(self, server: _Server) -> None:
+        """Serve a private leaderboard, responding 304 if not modified."""
+        body = leaderboard(server.members, server.days)
+        etag = f'"{sha256(body.encode()).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._send("", 304, etag)
+        else:
+            self._send(body, etag=etag)
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Serve the pages, inputs, calendars and leaderboards."""
+        server = cast(_Server, self.server)
+        server.requests.append(self.path)
+        if match := fullmatch(r"/(\d+)/day/(\d+)", self.path):
+            self._send(page(int(match[1]), int(match[2])))
+        elif match := fullmatch(r"/(\d+)/day/(\d+)/input", self.path):
+            self._send(puzzle_input(int(match[1]), int(match[2])))
+        elif match := fullmatch(r"/(\d+)", self.path):
+            self._send(calendar(int(match[1])))
+        elif fullmatch(r"/\d+/leaderboard/private/view/\d+\.json", self.path):
+            self._send_leaderboard(server)
+        else:
+            self._send("Not Found", 404)
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Respond to submitted answers."""
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        answer = form.get("answer", ["0"])[0]
+        self._send(_ANSWER.format(direction="high" if answer.endswith("1") else "low"))
+
+
+class FakeServer:
+    """Serve the stand-in website on localhost in a background thread."""
+
+    def __init__(self) -> None:
+        """Initializer."""
+        self.server = _Server()
+        self.root = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FakeServer":
+        """Start the server.
+
+        Returns:
+            FakeServer: the running server
+        """
+        self.thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,8 +1,14 @@
 """Initialise the package."""
 from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
 
+from advent.lib.memo import memo
+from advent.lib.parallel import pmap, preduce, shared_array, shared_input
 from advent.lib.part import PART_ONE, PART_TWO
-from advent.lib.puzzle import Puzzle
+from advent.lib.puzzle import Puzzle, PuzzleYear, get_puzzle
+from advent.lib.ranges import BoxSet, IntervalSet, RangeMap
+from advent.lib.report import report
+from advent.lib.simulate import simulate
 
 try:
     __version__ = version("advent-tool")
@@ -10,21 +16,48 @@ except PackageNotFoundError:  # pragma: no cover
     __version__ = "uninstalled"
 
 
-def load_puzzle(year: int, day: int) -> Puzzle:
+def load_puzzle(year: int, day: int, input_path: str | Path | None = None) -> Puzzle:
     """Main entry to the puzzle data.
 
+    Recently used puzzles are shared, rather than read from the cache again.
+
     Args:
         year (int): the year
         day (int): the day
+        input_path (str | Path | None): if given, read the input from this
+            file, such as a large stress test input, rather than the cache
 
     Returns:
         Puzzle: requested puzzle data
     """
-    return Puzzle(year, day)
+    return get_puzzle(year, day, Path(input_path) if input_path else None)
+
+
+def load_year(year: int) -> PuzzleYear:
+    """Load all of the puzzles for a year.
+
+    Args:
+        year (int): the year
+
+    Returns:
+        PuzzleYear: mapping of day to puzzle, loaded on first use
+    """
+    return PuzzleYear(year)
 
 
 __all__ = [
+    "BoxSet",
+    "IntervalSet",
     "load_puzzle",
+    "load_year",
+    "memo",
+    "report",
     "PART_ONE",
     "PART_TWO",
+    "pmap",
+    "preduce",
+    "RangeMap",
+    "shared_array",
+    "shared_input",
+    "simulate",
 ]
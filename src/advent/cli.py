@@ -1,17 +1,34 @@
 """Command Line Interace for the Advent Tool."""
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
 from datetime import datetime, timedelta, timezone
 from logging import DEBUG, INFO, WARNING, basicConfig, getLogger
-from subprocess import PIPE, STDOUT, Popen
+from pathlib import Path
 from sys import executable
 from time import sleep
+from typing import Any
 from webbrowser import open_new_tab
 
 from colorama import Fore, Style, init
 
-from advent import __version__, load_puzzle
+from advent import __version__, load_puzzle, load_year
+from advent.lib.cache import index_cached_pages
+from advent.lib.calendar import Calendar
 from advent.lib.config import settings
+from advent.lib.leaderboard import get_leaderboard
+from advent.lib.maintenance import collect_garbage, disk_usage
+from advent.lib.metrics import load, to_openmetrics
 from advent.lib.part import PART_ONE, Part
+from advent.lib.puzzle import input_variable
+from advent.lib.runner import (
+    Limits,
+    Run,
+    find_run,
+    record_run,
+    run_examples,
+    run_solution,
+    solution_key,
+)
+from advent.lib.search import search
 from advent.lib.template import save_template
 
 # configure the logger
@@ -71,18 +88,56 @@ def fetch_command(args: Namespace) -> None:
         save_template(puzzle)
 
 
+def _megabytes(size: int) -> str:
+    """Format a size in megabytes.
+
+    Args:
+        size (int): the size in bytes
+
+    Returns:
+        str: the formatted size
+    """
+    return f"{size / 1024 / 1024:.2f} MB"
+
+
 def cache_command(args: Namespace) -> None:
     """Handle the cache command.
 
     Args:
         args (Namespace): the command line arguments
     """
+    if args.year == "gc":
+        budget = settings.cache_budget
+        if args.budget is not None:
+            budget = int(args.budget * 1024 * 1024)
+        collection = collect_garbage(budget)
+        print(f"Compacted {collection.compacted_answers} submitted answers")
+        print(
+            f"Compacted {collection.compacted_pages} page versions, "
+            f"removing {collection.duplicate_pages} duplicates"
+        )
+        print(f"Evicted {collection.evicted_pages} page versions")
+        print(
+            f"Cache size {_megabytes(collection.size_before)} "
+            f"-> {_megabytes(collection.size_after)} "
+            f"(budget {_megabytes(budget)})"
+        )
+        return
+
+    if args.year == "du":
+        usage = disk_usage()
+        for (user, year, kind), size in sorted(usage.items()):
+            print(f"{user:20} {year:>4} {kind:12} {_megabytes(size):>12}")
+        print(f"{'total':38} {_megabytes(sum(usage.values())):>12}")
+        return
+
     last_day = (
         max(now().day, 25) if now().month == 12 and args.year == now().year else 25
     )
 
+    puzzles = load_year(args.year)
     for day in range(1, last_day + 1):
-        puzzle = load_puzzle(args.year, day)
+        puzzle = puzzles[day]
         _ = puzzle.input_file
         print(f"Caching {puzzle.day:02}/12/{puzzle.year:04}: {puzzle.title}")
 
@@ -145,6 +200,16 @@ def status_command(args: Namespace) -> None:
     Args:
         args (Namespace): the command line arguments
     """
+    if args.day is None:
+        calendar = Calendar(args.year, refresh=args.force)
+        for day, stars in calendar.stars.items():
+            print(
+                f"Day {day:02}: {Fore.YELLOW}{'*' * stars}"
+                f"{Style.DIM}{'*' * (2 - stars)}{Style.RESET_ALL}"
+            )
+        print(f"{sum(calendar.stars.values())} of 50 stars collected in {args.year}")
+        return
+
     puzzle = load_puzzle(args.year, args.day)
     for part in Part:
         part_str = f"Part {'One' if part == PART_ONE else 'Two'}"
@@ -160,6 +225,130 @@ def status_command(args: Namespace) -> None:
                 print(f"{color}{message}{Style.RESET_ALL}")
 
 
+def leaderboard_command(args: Namespace) -> None:
+    """Handle the leaderboard sub-command.
+
+    Args:
+        args (Namespace): the command line arguments
+    """
+    snapshot, delta = get_leaderboard(args.id, args.year)
+    changes = delta["members"] if delta else {}
+
+    # print the leaderboard, with the most recent changes
+    members = sorted(
+        snapshot["members"].items(), key=lambda x: (-x[1]["score"], x[1]["name"])
+    )
+    for rank, (key, member) in enumerate(members, start=1):
+        change = changes.get(key)
+        score = f"(+{change['score']})" if change and change["score"] else ""
+        stars = f"(+{change['stars']})" if change and change["stars"] else ""
+        print(
+            f"{rank:3}) {member['score']:5} {Fore.GREEN}{score:7}{Style.RESET_ALL}"
+            f"{member['stars']:3}* {Fore.YELLOW}{stars:6}{Style.RESET_ALL}"
+            f"{member['name']}"
+        )
+
+    # print the new stars
+    for change in changes.values():
+        for day, part, ts in change["new"]:
+            time = datetime.fromtimestamp(ts, tz=EST)
+            print(
+                f"{change['name']} got day {day} part {part} "
+                f"at {time:%Y-%m-%d %H:%M:%S}"
+            )
+
+    refresh = snapshot["fetched"] + settings.leaderboard_refresh
+    print(f"Next refresh after {datetime.fromtimestamp(refresh, tz=EST):%H:%M:%S}")
+
+
+def _check_files(name: str, input_path: Path | None) -> bool:
+    """Check the solution, and any replaced input, exist.
+
+    Args:
+        name (str): the path to the solution
+        input_path (Path | None): the replaced input, if any
+
+    Returns:
+        bool: True if the files exist
+    """
+    if not Path(name).is_file():
+        print(f"{Fore.RED}No solution at {name}{Style.RESET_ALL}")
+        return False
+    if input_path is not None and not input_path.is_file():
+        print(f"{Fore.RED}No input at {input_path}{Style.RESET_ALL}")
+        return False
+    return True
+
+
+def _check_examples(
+    args: Namespace, name: str, env: dict[str, str] | None, limits: Limits
+) -> bool:
+    """Run the solution on the puzzle examples in parallel.
+
+    Args:
+        args (Namespace): the command line arguments
+        name (str): the path to the solution
+        env (dict[str, str] | None): extra environment variables
+        limits (Limits): the resource limits
+
+    Returns:
+        bool: True if every example gave the expected answer
+    """
+    examples = load_puzzle(args.year, args.day).examples
+    if not examples:
+        print("No examples found")
+    passed = True
+    for example, run in run_examples(name, args.year, args.day, examples, env, limits):
+        part_str = f"Part {'One' if example.part == PART_ONE else 'Two'}"
+        answer = next(
+            (x.answer for x in run.results if x.part == example.part.value), None
+        )
+        if answer == example.answer:
+            print(f"{Fore.GREEN}Example {part_str} gave {answer}{Style.RESET_ALL}")
+        else:
+            passed = False
+            print(run.output.decode(errors="replace"), end="")
+            print(
+                f"{Fore.RED}Example {part_str} gave {answer}, "
+                f"expected {example.answer}{Style.RESET_ALL}"
+            )
+    return passed
+
+
+def _print_run(run: Run, input_size: int) -> None:
+    """Print the results, resource usage and throughput of a run.
+
+    Args:
+        run (Run): the run
+        input_size (int): the size of the input in bytes
+    """
+    if run.results:
+        print(f"{'Part':10}{'Answer':>20}{'Time':>12}{'Memory':>12}")
+    for result in run.results:
+        memory = (
+            f"{result.peak_memory / 1024 / 1024:.1f} MB"
+            if result.peak_memory is not None
+            else "-"
+        )
+        print(
+            f"{'Part One' if result.part == 1 else 'Part Two':10}"
+            f"{result.answer:>20}{result.elapsed * 1000:>9.1f} ms{memory:>12}"
+        )
+    if run.usage is not None:
+        print(
+            f"CPU {run.usage.user_time:.2f}s user, {run.usage.system_time:.2f}s "
+            f"system, peak memory {run.usage.peak_memory / 1024 / 1024:.1f} MB, "
+            f"{run.usage.voluntary_switches} voluntary and "
+            f"{run.usage.involuntary_switches} involuntary context switches"
+        )
+    if run.wall_time > 0:
+        size = input_size / 1024 / 1024
+        print(
+            f"Input {size:.1f} MB in {run.wall_time:.2f}s, "
+            f"{size / run.wall_time:.1f} MB/s"
+        )
+
+
 def run_command(args: Namespace) -> None:
     """Handle the run sub-command.
 
@@ -171,17 +360,123 @@ def run_command(args: Namespace) -> None:
         day=args.day,
     )
 
-    print(f"Executing {executable} {name}")
-    process = Popen(
-        [executable, name],  # noqa: S603
-        stdout=PIPE,
-        stderr=STDOUT,
-        bufsize=0,
+    limits = Limits(
+        timeout=args.timeout,
+        max_memory=args.max_memory * 1024 * 1024 if args.max_memory else None,
+        cpus=args.cpus,
     )
-    if process.stdout is not None:
-        with process.stdout:
-            for line in iter(process.stdout.readline, b""):  # b'\n'-separated lines
-                print(bytes.decode(line).strip())
+
+    env = {"ADVENT_NO_MEMO": "1"} if args.no_memo else {}
+
+    input_path = Path(args.input).resolve() if args.input else None
+    if not _check_files(name, input_path):
+        return
+
+    # reuse the recorded results if nothing has changed since the last run
+    key = solution_key(name, args.year, args.day, input_path)
+    run = None if args.force else find_run(args.year, args.day, key)
+    if run is not None:
+        print(f"Unchanged since {run.recorded}, using the recorded results")
+        print(run.output.decode(errors="replace"), end="")
+    else:
+        # check the solution against the examples first
+        if args.examples and not _check_examples(args, name, env, limits):
+            return
+
+        # replace the input for this run, such as with a large stress test input
+        if input_path is not None:
+            env[input_variable(args.year, args.day)] = str(input_path)
+
+        print(f"Executing {executable} {name}")
+        run = run_solution(name, env, limits)
+        record_run(args.year, args.day, run, limits, key)
+
+    # print the summary of the results
+    _print_run(run, load_puzzle(args.year, args.day, input_path).input_size)
+    if run.timed_out:
+        print(f"{Fore.RED}Timed out after {args.timeout}s{Style.RESET_ALL}")
+    elif run.returncode != 0:
+        print(f"{Fore.RED}Exited with code {run.returncode}{Style.RESET_ALL}")
+
+    # submit the answers, unless they are for a replaced input
+    if args.submit and input_path is not None:
+        print(f"{Fore.RED}Not submitting answers for {input_path}{Style.RESET_ALL}")
+    elif args.submit and run.returncode == 0:
+        puzzle = load_puzzle(args.year, args.day)
+        for result in run.results:
+            puzzle.submit(Part(result.part), result.answer)
+
+
+def _quantile(record: dict[str, Any], quantile: float) -> str:
+    """Estimate a quantile from the histogram buckets.
+
+    Args:
+        record (dict[str, Any]): the histogram record
+        quantile (float): the quantile, between 0 and 1
+
+    Returns:
+        str: the upper bound of the bucket containing the quantile
+    """
+    cumulative = 0
+    for bound, count in zip([*record["bounds"], "+Inf"], record["buckets"]):
+        cumulative += count
+        if cumulative >= quantile * record["count"]:
+            return f"<={bound}"
+    return "-"
+
+
+def stats_command(args: Namespace) -> None:
+    """Handle the stats sub-command.
+
+    Args:
+        args (Namespace): the command line arguments
+    """
+    path = settings.tool_path / "metrics.jsonl"
+    records = load(path)
+    if args.clear:
+        path.unlink(missing_ok=True)
+
+    # export the metrics
+    if args.openmetrics:
+        with Path(args.openmetrics).open("w") as file:
+            file.write(to_openmetrics(records))
+        print(f"Saved metrics to {args.openmetrics}")
+        return
+
+    # print the summary
+    if not records:
+        print("No metrics recorded")
+    for record in records:
+        labels = ",".join(f"{key}={value}" for key, value in record["labels"].items())
+        name = f"{record['name']}{{{labels}}}" if labels else record["name"]
+        if record["type"] == "counter":
+            print(f"{name:60} {record['value']:>12g}")
+        else:
+            print(
+                f"{name:60} {record['count']:>12} calls, "
+                f"mean {record['sum'] / record['count']:.4f}s, "
+                f"p50 {_quantile(record, 0.5)}s, "
+                f"p95 {_quantile(record, 0.95)}s"
+            )
+
+
+def search_command(args: Namespace) -> None:
+    """Handle the search sub-command.
+
+    Args:
+        args (Namespace): the command line arguments
+    """
+    indexed = index_cached_pages()
+    if indexed:
+        log.info(f"Indexed {indexed} puzzle pages")
+
+    hits = search(" ".join(args.terms), limit=args.limit)
+    if not hits:
+        print("No matching puzzles")
+    for hit in hits:
+        part_str = f"Part {'One' if hit.part == 1 else 'Two'}"
+        print(f"{Fore.GREEN}{hit.year} Day {hit.day:02} {part_str}: {hit.title}")
+        print(f"{Style.RESET_ALL}    {' '.join(hit.snippet.split())}")
 
 
 def set_verbose_level(args: Namespace) -> None:
@@ -195,25 +490,72 @@ def set_verbose_level(args: Namespace) -> None:
             log.setLevel(DEBUG)
 
 
+def _cpu_list(text: str) -> set[int]:
+    """Parse a list of CPUs, such as 0,2,4-7.
+
+    Args:
+        text (str): the list of CPUs
+
+    Returns:
+        set[int]: the CPUs
+
+    Raises:
+        ArgumentTypeError: Raised if the list is not valid
+    """
+    cpus: set[int] = set()
+    try:
+        for item in text.split(","):
+            first, _, last = item.partition("-")
+            cpus.update(range(int(first), int(last or first) + 1))
+    except ValueError as error:
+        raise ArgumentTypeError(f"invalid CPU list: {text}") from error  # noqa: TRY003
+    return cpus
+
+
+def _cache_target(text: str) -> int | str:
+    """Parse the target of the cache command, either a year, gc or du.
+
+    Args:
+        text (str): the target
+
+    Returns:
+        int | str: the year, or the maintenance command
+
+    Raises:
+        ArgumentTypeError: Raised if the target is not valid
+    """
+    if text in ("gc", "du"):
+        return text
+    year = now().year - 1 if now().month < 12 else now().year
+    if not text.isdigit() or int(text) not in range(2015, year + 1):
+        raise ArgumentTypeError(  # noqa: TRY003
+            f"invalid choice: {text} (choose gc, du or 2015 to {year})"
+        )
+    return int(text)
+
+
 def _create_argument_parser() -> ArgumentParser:
     """Create the argument parser."""
 
-    def add_year_argument(parser: ArgumentParser) -> None:
+    def add_year_argument(parser: ArgumentParser, optional: bool = False) -> None:
         year = now().year - 1 if now().month < 12 else now().year
         parser.add_argument(
             "year",
             type=int,
             choices=range(2015, year + 1),
             metavar="year",
+            nargs="?" if optional else None,
+            default=year,
             help=f"the year to fetch (2015 to {year})",
         )
 
-    def add_day_argument(parser: ArgumentParser) -> None:
+    def add_day_argument(parser: ArgumentParser, optional: bool = False) -> None:
         parser.add_argument(
             "day",
             type=int,
             choices=range(1, 26),
             metavar="day",
+            nargs="?" if optional else None,
             help="the day to open (1 to 25)",
         )
 
@@ -266,7 +608,18 @@ def _create_argument_parser() -> ArgumentParser:
         "cache",
         help="cache puzzle page and puzzle input from the AOC server",
     )
-    add_year_argument(cache_parser)
+    cache_parser.add_argument(
+        "year",
+        type=_cache_target,
+        metavar="year|gc|du",
+        help="the year to cache, gc to compact the cache or du to show its size",
+    )
+    cache_parser.add_argument(
+        "--budget",
+        type=float,
+        metavar="MB",
+        help="the size budget for gc, in megabytes (default from the config)",
+    )
     cache_parser.set_defaults(func=cache_command)
 
     # countdown sub-command
@@ -302,15 +655,106 @@ def _create_argument_parser() -> ArgumentParser:
     # status sub-command
     status_parser = subparsers.add_parser("status", help="show the status of a puzzle")
     add_year_argument(status_parser)
-    add_day_argument(status_parser)
+    add_day_argument(status_parser, optional=True)
+    status_parser.add_argument(
+        "--force",
+        "-f",
+        action="store_true",
+        help="force a refresh of the calendar, when showing the whole year",
+    )
     status_parser.set_defaults(func=status_command)
 
+    # leaderboard sub-command
+    leaderboard_parser = subparsers.add_parser(
+        "leaderboard", help="show a private leaderboard"
+    )
+    leaderboard_parser.add_argument("id", type=int, help="the private leaderboard id")
+    add_year_argument(leaderboard_parser, optional=True)
+    leaderboard_parser.set_defaults(func=leaderboard_command)
+
     # run sub-command
     run_parser = subparsers.add_parser("run", help="run the puzzle")
     add_year_argument(run_parser)
     add_day_argument(run_parser)
+    run_parser.add_argument(
+        "--no-memo",
+        action="store_true",
+        help="ignore results stored by the memo decorator",
+    )
+    run_parser.add_argument(
+        "--submit",
+        "-s",
+        action="store_true",
+        help="submit the reported answers",
+    )
+    run_parser.add_argument(
+        "--examples",
+        "-e",
+        action="store_true",
+        help="check the solution against the puzzle examples first",
+    )
+    run_parser.add_argument(
+        "--input",
+        "-i",
+        metavar="PATH",
+        help="run on this input file, rather than the puzzle input",
+    )
+    run_parser.add_argument(
+        "--force",
+        "-f",
+        action="store_true",
+        help="run the solution, even if it is unchanged since the last run",
+    )
+    run_parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="seconds",
+        help="kill the solution after this many seconds",
+    )
+    run_parser.add_argument(
+        "--max-memory",
+        type=int,
+        metavar="MB",
+        help="limit the address space of the solution, in megabytes",
+    )
+    run_parser.add_argument(
+        "--cpus",
+        type=_cpu_list,
+        metavar="list",
+        help="the CPUs the solution may run on, such as 0,2,4-7",
+    )
     run_parser.set_defaults(func=run_command)
 
+    # stats sub-command
+    stats_parser = subparsers.add_parser(
+        "stats", help="summarise the cache, HTTP and parsing metrics"
+    )
+    stats_parser.add_argument(
+        "--openmetrics",
+        metavar="file",
+        help="save the metrics to a file in the OpenMetrics text format",
+    )
+    stats_parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="clear the recorded metrics",
+    )
+    stats_parser.set_defaults(func=stats_command)
+
+    # search sub-command
+    search_parser = subparsers.add_parser(
+        "search", help="search the descriptions of the cached puzzles"
+    )
+    search_parser.add_argument("terms", nargs="+", help="the terms to search for")
+    search_parser.add_argument(
+        "--limit",
+        "-n",
+        type=int,
+        default=10,
+        help="the maximum number of puzzles to show (default 10)",
+    )
+    search_parser.set_defaults(func=search_command)
+
     return parser
 
 
@@ -1,13 +1,103 @@
-"""Cache module for the puzzle pages and puzzle input."""
+"""Cache module for the puzzle pages and puzzle input.
+
+Downloads are cached in the machine-wide store, shared by every project.
+Files in the project's own cache take precedence, as an overlay.
+"""
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from hashlib import sha256
+from json import dumps, load
+from logging import getLogger
+from os import getpid
 from pathlib import Path
+from shutil import copyfile
+from sqlite3 import Error as SQLiteError
+from typing import Any
 
 from advent.lib.config import settings
 from advent.lib.filename import decode, encode
 from advent.lib.http import fetch
+from advent.lib.metrics import cache_requests
 from advent.lib.part import PART_ONE, PART_TWO, Part
+from advent.lib.search import index_page, indexed_pages
+
+try:
+    from fcntl import LOCK_EX, LOCK_UN, flock
+except ImportError:  # pragma: no cover
+    flock = None  # type: ignore[assignment]
 
 _level = {PART_ONE: "1", PART_TWO: "2"}
 
+log = getLogger(__name__)
+
+
+def cache_roots() -> list[Path]:
+    """The cache folders, with the project's overlay first.
+
+    Returns:
+        list[Path]: the folders
+    """
+    project = settings.tool_path / "cache"
+    if settings.cache_path == project:
+        return [project]
+    return [project, settings.cache_path]
+
+
+def find_cached(relative: str) -> Path:
+    """Find a file in the project's overlay, or else in the shared cache.
+
+    Args:
+        relative (str): the path, relative to the cache folder
+
+    Returns:
+        Path: the path to the file, which may not exist yet
+    """
+    for root in cache_roots():
+        if (root / relative).exists():
+            return root / relative
+    return settings.cache_path / relative
+
+
+@contextmanager
+def locked(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock for a file, shared with other processes.
+
+    The lock files are kept together in the machine-wide store, rather than
+    next to the cached files, named by a hash of the file's absolute path.
+
+    Args:
+        path (Path): the file
+
+    Yields:
+        None: while the lock is held
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    folder = settings.shared_path / "locks"
+    folder.mkdir(parents=True, exist_ok=True)
+    name = sha256(str(path.resolve()).encode()).hexdigest()[:32]
+    with (folder / f"{name}.lock").open("w") as lock:
+        if flock is not None:
+            flock(lock, LOCK_EX)
+        try:
+            yield
+        finally:
+            if flock is not None:
+                flock(lock, LOCK_UN)
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Write a file, so that readers see either the old or the new contents.
+
+    Args:
+        path (Path): the file
+        text (str): the contents
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.{getpid()}.tmp")
+    with temp.open("w") as file:
+        file.write(text)
+    temp.replace(path)
+
 
 def get_puzzle_page(
     year: int, day: int, user: str = "default", refresh: bool = False
@@ -23,11 +113,123 @@ def get_puzzle_page(
     Returns:
         str: the html page
     """
+
+    def on_write(path: Path, html: str) -> None:
+        _index(year, day, path, html, user)
+
     return _cached_or_fetch(
-        settings.tool_path / f"cache/{user}/{year}/{day:02}/index.html",
+        f"{user}/{year}/{day:02}/index.html",
         f"{settings.http_root}/{year}/day/{day}",
         None,
         refresh,
+        "page",
+        on_write,
+    )
+
+
+def _index(year: int, day: int, path: Path, html: str, user: str) -> None:
+    """Add a cached puzzle page to the search index.
+
+    A failure to index is logged, rather than failing the download.
+
+    Args:
+        year (int): the year
+        day (int): the day
+        path (Path): the cached page
+        html (str): the page
+        user (str): the user
+    """
+    try:
+        index_page(year, day, html, path.stat().st_mtime, user)
+    except SQLiteError as error:
+        log.warning(f"Unable to index {year} day {day}: {error}")
+
+
+def index_cached_pages(user: str = "default") -> int:
+    """Bring the search index up to date with the cached puzzle pages.
+
+    Only pages cached or changed since they were last indexed are read, so
+    this is quick once the index is built.
+
+    Args:
+        user (str): the user
+
+    Returns:
+        int: the number of pages indexed
+    """
+    indexed = indexed_pages(user)
+    seen = set()
+    count = 0
+    for root in cache_roots():
+        for page in root.glob(f"{user}/*/*/index.html"):
+            year, day = page.parent.parent.name, page.parent.name
+            if not (year.isdigit() and day.isdigit()):
+                continue
+            key = (int(year), int(day))
+            if key not in seen and page.stat().st_mtime > indexed.get(key, 0):
+                with page.open() as file:
+                    _index(*key, page, file.read(), user)
+                count += 1
+            seen.add(key)
+    return count
+
+
+def read_puzzle_pages(year: int, user: str = "default") -> dict[int, str]:
+    """Read all of the cached puzzle pages for a year, in a single pass.
+
+    Args:
+        year (int): the year
+        user (str): the user
+
+    Returns:
+        dict[int, str]: mapping of day to html page, for the cached days
+    """
+    found: dict[int, str] = {}
+    for root in cache_roots():
+        path = root / f"{user}/{year}"
+        if path.exists():
+            for child in path.iterdir():
+                page = child / "index.html"
+                if (
+                    child.name.isdigit()
+                    and int(child.name) not in found
+                    and page.exists()
+                ):
+                    cache_requests.inc(kind="page", result="hit")
+                    with page.open() as file:
+                        found[int(child.name)] = file.read()
+    return found
+
+
+def get_calendar_page(year: int, user: str = "default", refresh: bool = False) -> str:
+    """Get the calendar page for a year from the cache, or download if needed.
+
+    The cached calendar is refreshed automatically if any of the puzzle
+    pages for the year have been cached since, as the stars may have changed.
+
+    Args:
+        year (int): the year
+        user (str): the user
+        refresh (bool): if True, forces a cache refresh.
+
+    Returns:
+        str: the html page
+    """
+    relative = f"{user}/{year}/index.html"
+    path = find_cached(relative)
+    if path.exists() and not refresh:
+        modified = path.stat().st_mtime
+        refresh = any(
+            page.stat().st_mtime > modified
+            for root in cache_roots()
+            for page in (root / f"{user}/{year}").glob("*/index.html")
+        )
+    return _cached_or_fetch(
+        relative,
+        f"{settings.http_root}/{year}",
+        None,
+        refresh,
+        "calendar",
     )
 
 
@@ -46,10 +248,34 @@ def get_puzzle_input(
         str: the plaintext puzzle input file
     """
     return _cached_or_fetch(
-        settings.tool_path / f"cache/{user}/{year}/{day:02}/input.txt",
+        f"{user}/{year}/{day:02}/input.txt",
         f"{settings.http_root}/{year}/day/{day}/input",
         None,
         refresh,
+        "input",
+    )
+
+
+def get_puzzle_input_path(
+    year: int, day: int, user: str = "default", refresh: bool = False
+) -> Path:
+    """Find the puzzle input in the cache, downloading it if needed.
+
+    Args:
+        year (int): year
+        day (int): day
+        user (str): the user
+        refresh (bool): if True, force a cache refresh
+
+    Returns:
+        Path: the path to the cached input, for streaming large inputs
+    """
+    return _cached_path_or_fetch(
+        f"{user}/{year}/{day:02}/input.txt",
+        f"{settings.http_root}/{year}/day/{day}/input",
+        None,
+        refresh,
+        "input",
     )
 
 
@@ -77,11 +303,11 @@ def post_puzzle_answer(
     name = encode(str(answer))
     data = {"level": _level[part], "answer": str(answer)}
     return _cached_or_fetch(
-        settings.tool_path
-        / f"cache/{user}/{year}/{day:02}/answer/{_level[part]}/{name}.html",
+        f"{user}/{year}/{day:02}/answer/{_level[part]}/{name}.html",
         f"{settings.http_root}/{year}/day/{day}/answer",
         data,
         refresh,
+        "answer",
     )
 
 
@@ -102,40 +328,161 @@ def lookup_answers(
     Returns:
         dict[str, str]: mapping of answer to html
     """
-    path = settings.tool_path / f"cache/{user}/{year}/{day:02}/answer/{_level[part]}/"
+    children = [
+        child
+        for root in reversed(cache_roots())
+        if (root / f"{user}/{year}/{day:02}/answer/{_level[part]}").exists()
+        for child in (root / f"{user}/{year}/{day:02}/answer/{_level[part]}").iterdir()
+        if child.is_file() and child.name.endswith(".html")
+    ]
     found = {}
-    if path.exists():
-        for child in sorted(path.iterdir(), key=lambda x: x.stat().st_mtime):
-            if child.is_file() and child.name.endswith(".html"):
-                with child.open() as file:
-                    found[decode(child.name[:-5])] = file.read()
+    for child in sorted(children, key=lambda x: x.stat().st_mtime):
+        with child.open() as file:
+            found[decode(child.name[:-5])] = file.read()
+    return found
+
+
+def lookup_verdicts(
+    year: int,
+    day: int,
+    part: Part,
+    user: str = "default",
+) -> dict[str, str]:
+    """Retrieve the verdicts of submitted answers compacted by the cache gc.
+
+    Args:
+        year (int): the year
+        day (int): the day
+        part (Part): the part
+        user (str): the user
+
+    Returns:
+        dict[str, str]: mapping of answer to message, in submission order
+    """
+    found: dict[str, str] = {}
+    for root in reversed(cache_roots()):
+        path = root / f"{user}/{year}/{day:02}/answer/{_level[part]}/verdicts.json"
+        if path.exists():
+            with path.open() as file:
+                found.update(load(file))
     return found
 
 
+def read_examples(
+    year: int, day: int, user: str = "default"
+) -> list[dict[str, Any]] | None:
+    """Read the examples extracted from the puzzle page from the cache.
+
+    Args:
+        year (int): the year
+        day (int): the day
+        user (str): the user
+
+    Returns:
+        list[dict[str, Any]] | None: the examples, or None if missing or
+            older than the cached puzzle page
+    """
+    # the examples are kept with the page they were extracted from
+    page = find_cached(f"{user}/{year}/{day:02}/index.html")
+    path = page.parent / "examples.json"
+    if not path.exists() or (
+        page.exists() and page.stat().st_mtime > path.stat().st_mtime
+    ):
+        cache_requests.inc(kind="examples", result="miss")
+        return None
+    cache_requests.inc(kind="examples", result="hit")
+    with path.open() as file:
+        return list(load(file))
+
+
+def save_examples(
+    year: int, day: int, examples: list[dict[str, Any]], user: str = "default"
+) -> None:
+    """Save the examples extracted from the puzzle page in the cache.
+
+    Args:
+        year (int): the year
+        day (int): the day
+        examples (list[dict[str, Any]]): the examples
+        user (str): the user
+    """
+    page = find_cached(f"{user}/{year}/{day:02}/index.html")
+    write_atomic(page.parent / "examples.json", dumps(examples))
+
+
+def _cached_path_or_fetch(
+    relative: str,
+    url: str,
+    data: dict[str, str] | None,
+    refresh: bool,
+    kind: str,
+    on_write: Callable[[Path, str], None] | None = None,
+) -> Path:
+    """Find a file in the cache, or get it from the URL first.
+
+    The download is made while holding a lock on the file, so concurrent
+    processes wanting the same file download it only once.
+
+    Args:
+        relative (str): the path, relative to the cache folder
+        url (str): the URL to download
+        data (dict[str, str] | None): the data
+        refresh (bool): if True, forces a cache refresh.
+        kind (str): the kind of file, for the metrics
+        on_write (Callable[[Path, str], None] | None): called with the path
+            and contents whenever the file is written
+
+    Returns:
+        Path: the path to the file in the cache
+    """
+    # fetch the file, if required
+    cache_path = find_cached(relative)
+    if refresh or not cache_path.exists():
+        with locked(cache_path):
+            # another process may have fetched it while waiting for the lock
+            if refresh or not cache_path.exists():
+                cache_requests.inc(kind=kind, result="miss")
+                html = fetch(url, data)
+
+                # keep the previous version of refreshed pages in the history
+                if kind == "page" and cache_path.exists():
+                    history = cache_path.parent / "history"
+                    history.mkdir(exist_ok=True)
+                    name = f"{cache_path.stat().st_mtime_ns}.html"
+                    copyfile(cache_path, history / name)
+
+                write_atomic(cache_path, html)
+                if on_write is not None:
+                    on_write(cache_path, html)
+            else:
+                cache_requests.inc(kind=kind, result="hit")
+    else:
+        cache_requests.inc(kind=kind, result="hit")
+    return cache_path
+
+
 def _cached_or_fetch(
-    cache_path: Path,
+    relative: str,
     url: str,
     data: dict[str, str] | None,
     refresh: bool,
+    kind: str,
+    on_write: Callable[[Path, str], None] | None = None,
 ) -> str:
     """Read file from the cache, or get from the URL.
 
     Args:
-        cache_path (Path): the path in the cache
+        relative (str): the path, relative to the cache folder
         url (str): the URL to download
         data (dict[str, str] | None): the data
         refresh (bool): if True, forces a cache refresh.
+        kind (str): the kind of file, for the metrics
+        on_write (Callable[[Path, str], None] | None): called with the path
+            and contents whenever the file is written
 
     Returns:
         str: the requested file
     """
-    # fetch the file, if required
-    if refresh or not cache_path.exists():
-        html = fetch(url, data)
-        cache_path.parent.mkdir(parents=True, exist_ok=True)
-        with cache_path.open("w") as file:
-            file.write(html)
-
-    # return the file
-    with cache_path.open() as file:
+    path = _cached_path_or_fetch(relative, url, data, refresh, kind, on_write)
+    with path.open() as file:
         return file.read()
@@ -0,0 +1,47 @@
+"""Calendar Class."""
+from functools import cached_property
+from re import fullmatch
+
+from advent.lib.cache import get_calendar_page
+from advent.lib.config import settings
+from advent.lib.parse import parse_html
+
+# the number of stars for each of the calendar classes
+_stars = {"calendar-complete": 1, "calendar-verycomplete": 2}
+
+
+class Calendar:
+    """The calendar for a year, showing the stars collected each day."""
+
+    def __init__(self, year: int, refresh: bool = False) -> None:
+        """Initializer.
+
+        Args:
+            year (int): the year
+            refresh (bool): if True, forces a cache refresh
+        """
+        self.year = year
+        self.page_url = f"{settings.http_root}/{self.year}"
+        self.refresh = refresh
+
+    @cached_property
+    def stars(self) -> dict[int, int]:
+        """The stars collected for each day of the year.
+
+        Returns:
+            dict[int, int]: mapping of day to stars, from zero to two
+        """
+        soup = parse_html(self._html)
+        found = dict.fromkeys(range(1, 26), 0)
+        for element in soup.select("[class^=calendar-day]"):
+            classes = element.get("class") or []
+            match = fullmatch(r"calendar-day(\d+)", classes[0])
+            if match and int(match[1]) in found:
+                found[int(match[1])] = max(
+                    (_stars.get(name, 0) for name in classes), default=0
+                )
+        return found
+
+    @cached_property
+    def _html(self) -> str:
+        return get_calendar_page(self.year, refresh=self.refresh)
@@ -11,6 +11,11 @@ T = TypeVar("T", bound=str | int | bool | float)
 
 _TOOL_PATH = Path(".advent-tool")
 
+# the machine-wide store, shared by every project
+_SHARED_PATH = (
+    Path(environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "advent-tool"
+)
+
 
 def _load_config_file() -> dict[str, Any]:
     """Load the TOML configuration file.
@@ -62,10 +67,11 @@ def _config_property(*args: str, default: T) -> T:
     return default
 
 
-def _find_session() -> str | None:
-    if (_TOOL_PATH / "session.txt").exists():
-        with (_TOOL_PATH / "session.txt").open() as file:
-            return file.read()
+def _find_session(shared_path: Path) -> str | None:
+    for folder in (_TOOL_PATH, shared_path):
+        if (folder / "session.txt").exists():
+            with (folder / "session.txt").open() as file:
+                return file.read()
 
     if environ["AOC_SESSION"]:
         return environ["AOC_SESSION"]
@@ -77,8 +83,12 @@ def _find_session() -> str | None:
 class Settings:
     """User settings."""
 
-    # system path
+    # system paths, for the project and the machine-wide store
     tool_path: Path
+    shared_path: Path
+    # the folder downloads are cached in, shared by every project unless
+    # disabled, with the project's cache as an overlay
+    cache_path: Path
     # HTTP
     http_root: str
     http_user_agent: str
@@ -89,13 +99,30 @@ class Settings:
     # input
     input_save_enabled: bool
     input_save_path: str
+    # memo
+    memo_enabled: bool
+    memo_max_size: int
+    # cache
+    cache_budget: int
+    # metrics
+    metrics_enabled: bool
+    # leaderboard
+    leaderboard_refresh: int
     # session cookie
     session: str | None
 
 
+_shared_path = Path(
+    _config_property("cache", "path", default=str(_SHARED_PATH))
+).expanduser()
+
 settings = Settings(
-    # system path
+    # system paths
     tool_path=_TOOL_PATH,
+    shared_path=_shared_path,
+    cache_path=_shared_path / "cache"
+    if _config_property("cache", "shared", default=True)
+    else _TOOL_PATH / "cache",
     # HTTP
     http_root=_config_property("http", "root", default="https://adventofcode.com"),
     http_user_agent="https://github.com/pjd199/advent-tool",
@@ -110,6 +137,18 @@ settings = Settings(
     input_save_path=_config_property(
         "input", "path", default="src/{year:04}/{day:02}/input.txt"
     ),
+    # memo
+    memo_enabled=_config_property("memo", "enabled", default=True)
+    and "ADVENT_NO_MEMO" not in environ,
+    memo_max_size=_config_property("memo", "size", default=1024 * 1024 * 1024),
+    # cache, with the size budget kept by advent cache gc
+    cache_budget=_config_property("cache", "budget", default=256 * 1024 * 1024),
+    # metrics
+    metrics_enabled=_config_property("metrics", "enabled", default=True),
+    # leaderboard, which the site asks to be polled at most every 15 minutes
+    leaderboard_refresh=max(
+        15 * 60, _config_property("leaderboard", "refresh", default=15 * 60)
+    ),
     # session cookie
-    session=_find_session(),
+    session=_find_session(_shared_path),
 )
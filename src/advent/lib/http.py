@@ -1,6 +1,8 @@
 """HTTP interface for the Advent of Code website."""
+from dataclasses import dataclass
 from logging import getLogger
 from sqlite3 import connect
+from time import perf_counter
 
 from pyrate_limiter.abstracts.rate import Duration, Rate
 from pyrate_limiter.buckets.sqlite_bucket import Queries, SQLiteBucket
@@ -8,18 +10,27 @@ from pyrate_limiter.limiter import Limiter
 from requests import get, post
 
 from advent.lib.config import settings
+from advent.lib.metrics import (
+    http_bytes,
+    http_responses,
+    http_seconds,
+    limiter_seconds,
+)
 
 # create the rate limiter using an SQLite backend, to allow
-# 3 requests every 3 seconds (i.e. average of one a second).
+# 3 requests every 3 seconds (i.e. average of one a second). The
+# database is in the machine-wide store, so the limit covers every project.
 _bucket_size = 3
 _rates = [
     Rate(_bucket_size, _bucket_size * Duration.SECOND),
 ]
 _table = "my-bucket-table"
+settings.shared_path.mkdir(parents=True, exist_ok=True)
 _sqlite_connection = connect(
-    ".advent-tool/pyrate.sqlite",
+    settings.shared_path / "pyrate.sqlite",
     isolation_level="EXCLUSIVE",
     check_same_thread=False,
+    timeout=60,
 )
 _sqlite_connection.cursor().execute(Queries.CREATE_BUCKET_TABLE.format(table=_table))
 _bucket = SQLiteBucket(_rates, _sqlite_connection, _table)
@@ -29,12 +40,28 @@ limiter = Limiter(_bucket, max_delay=Duration.MINUTE)
 log = getLogger(__name__)
 
 
-def fetch(url: str, data: dict[str, str] | None = None) -> str:
+@dataclass
+class Validators:
+    """Validators for a conditional GET, updated from each response."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+    # False if the server responded 304 Not Modified
+    modified: bool = True
+
+
+def fetch(
+    url: str,
+    data: dict[str, str] | None = None,
+    validators: Validators | None = None,
+) -> str:
     """Download file from URL, optionally POSTing data.
 
     Args:
         url (str): the URL to download.
         data (dict[str,str] | None): the data to POST
+        validators (Validators | None): if given, make a conditional GET,
+            returning an empty string if the file has not been modified
 
     Returns:
         str: the download file
@@ -45,7 +72,8 @@ def fetch(url: str, data: dict[str, str] | None = None) -> str:
     # apply the rate limiter, delaying until we're good to go
     if _bucket.count() > _bucket_size:
         log.info("Enforcing HTTP rate limits")
-    limiter.try_acquire(url)
+    with limiter_seconds.time():
+        limiter.try_acquire(url)
 
     # prepare the headers and cookies
     headers = {"User-Agent": settings.http_user_agent}
@@ -54,17 +82,35 @@ def fetch(url: str, data: dict[str, str] | None = None) -> str:
         cookies["session"] = settings.session
     else:
         log.warning("No SESSION ID found.")
+    if validators and validators.etag:
+        headers["If-None-Match"] = validators.etag
+    if validators and validators.last_modified:
+        headers["If-Modified-Since"] = validators.last_modified
 
+    start = perf_counter()
     if data:
         # POST the URL
+        method = "POST"
         response = post(url, headers=headers, cookies=cookies, timeout=60, data=data)
-        log.info(f"POST - {url} - {response.status_code} {response.reason}")
     else:
         # GET the URL
+        method = "GET"
         response = get(url, headers=headers, cookies=cookies, timeout=60)
-        log.info(f"GET - {url} - {response.status_code} {response.reason}")
+    log.info(f"{method} - {url} - {response.status_code} {response.reason}")
+
+    # record the metrics
+    http_seconds.observe(perf_counter() - start, method=method)
+    http_responses.inc(method=method, status=response.status_code)
+    http_bytes.inc(len(response.content), method=method)
 
     # check the response and return the file
+    if validators:
+        validators.modified = response.status_code != 304
+        if validators.modified:
+            validators.etag = response.headers.get("ETag")
+            validators.last_modified = response.headers.get("Last-Modified")
+        else:
+            return ""
     if response.status_code != 200:
         raise FileNotFoundError
     return response.text
@@ -0,0 +1,153 @@
+"""Private leaderboard, with snapshots and per-member changes."""
+from json import dumps, load, loads
+from logging import getLogger
+from pathlib import Path
+from time import time
+from typing import Any
+
+from advent.lib.cache import locked, write_atomic
+from advent.lib.config import settings
+from advent.lib.http import Validators, fetch
+from advent.lib.metrics import cache_requests
+
+log = getLogger(__name__)
+
+Snapshot = dict[str, Any]
+Delta = dict[str, Any]
+
+
+def _compact(member: dict[str, Any]) -> dict[str, Any]:
+    """Compact a member from the leaderboard JSON.
+
+    Args:
+        member (dict[str, Any]): the member in the leaderboard JSON
+
+    Returns:
+        dict[str, Any]: the member, with star timestamps as {day: [ts, ts]}
+    """
+    return {
+        "name": member["name"] or f"(anonymous user #{member['id']})",
+        "score": member["local_score"],
+        "stars": member["stars"],
+        "last_star_ts": member["last_star_ts"],
+        "days": {
+            day: [parts[part]["get_star_ts"] for part in sorted(parts)]
+            for day, parts in member["completion_day_level"].items()
+        },
+    }
+
+
+def _diff(
+    previous: dict[str, dict[str, Any]], members: dict[str, dict[str, Any]]
+) -> tuple[dict[str, dict[str, Any]], dict[str, dict[str, Any]]]:
+    """Compact the members and find the changes since the previous snapshot.
+
+    Members with an unchanged score and last star time are carried over from
+    the previous snapshot, without processing their completion data.
+
+    Args:
+        previous (dict[str, dict[str, Any]]): the previous compact members
+        members (dict[str, dict[str, Any]]): the members in the leaderboard JSON
+
+    Returns:
+        tuple[dict[str, dict[str, Any]], dict[str, dict[str, Any]]]: the
+            compact members, and the changes for each changed member
+    """
+    compact: dict[str, dict[str, Any]] = {}
+    changes: dict[str, dict[str, Any]] = {}
+    for key, member in members.items():
+        old = previous.get(key)
+        if (
+            old is not None
+            and old["last_star_ts"] == member["last_star_ts"]
+            and old["score"] == member["local_score"]
+        ):
+            compact[key] = old
+            continue
+
+        new = compact[key] = _compact(member)
+        old_days = old["days"] if old else {}
+        changes[key] = {
+            "name": new["name"],
+            "score": new["score"] - (old["score"] if old else 0),
+            "stars": new["stars"] - (old["stars"] if old else 0),
+            "new": sorted(
+                # lists, like the snapshot read back from JSON
+                [int(day), part + 1, ts]
+                for day, stamps in new["days"].items()
+                for part, ts in enumerate(stamps)
+                if part >= len(old_days.get(day, []))
+            ),
+        }
+    return compact, changes
+
+
+def _refresh(snapshot: Snapshot, board: int, year: int, root: Path) -> None:
+    """Fetch a private leaderboard, updating and saving the snapshot.
+
+    Args:
+        snapshot (Snapshot): the previous snapshot, which is updated
+        board (int): the leaderboard id
+        year (int): the year
+        root (Path): the folder for the snapshot and history
+    """
+    # fetch the leaderboard, if modified
+    validators = Validators(snapshot.get("etag"), snapshot.get("last_modified"))
+    text = fetch(
+        f"{settings.http_root}/{year}/leaderboard/private/view/{board}.json",
+        validators=validators,
+    )
+    snapshot["fetched"] = time()
+    root.mkdir(parents=True, exist_ok=True)
+    if validators.modified:
+        members, changes = _diff(snapshot["members"], loads(text)["members"])
+        snapshot["etag"] = validators.etag
+        snapshot["last_modified"] = validators.last_modified
+        snapshot["members"] = members
+        if changes:
+            snapshot["delta"] = {"time": snapshot["fetched"], "members": changes}
+            with (root / "history.jsonl").open("a") as file:
+                file.write(dumps(snapshot["delta"], separators=(",", ":")) + "\n")
+    else:
+        log.info(f"Leaderboard {board} {year} not modified")
+
+    # save the snapshot
+    write_atomic(root / "snapshot.json", dumps(snapshot, separators=(",", ":")))
+
+
+def get_leaderboard(
+    board: int, year: int, user: str = "default"
+) -> tuple[Snapshot, Delta | None]:
+    """Get a private leaderboard from the cache, or download if stale.
+
+    The cached snapshot is only refreshed once the leaderboard refresh time
+    has passed, using a conditional request. Changes from the previous
+    snapshot are kept with the snapshot, and appended to a history file.
+
+    Args:
+        board (int): the leaderboard id
+        year (int): the year
+        user (str): the user
+
+    Returns:
+        tuple[Snapshot, Delta | None]: the latest snapshot, and the most
+            recent changes
+    """
+    root = settings.cache_path / f"{user}/leaderboard/{board}/{year}"
+    snapshot_path = root / "snapshot.json"
+
+    # the snapshot is shared by every project, so hold the lock while updating
+    with locked(snapshot_path):
+        # read the previous snapshot
+        snapshot: Snapshot = {"fetched": 0, "members": {}}
+        if snapshot_path.exists():
+            with snapshot_path.open() as file:
+                snapshot = load(file)
+
+        # use the cached snapshot, unless it's time to refresh
+        if time() - snapshot["fetched"] < settings.leaderboard_refresh:
+            cache_requests.inc(kind="leaderboard", result="hit")
+            return snapshot, snapshot.get("delta")
+        cache_requests.inc(kind="leaderboard", result="miss")
+        _refresh(snapshot, board, year, root)
+        return snapshot, snapshot.get("delta")
@@ -0,0 +1,262 @@
+"""Cache garbage collection and disk usage."""
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from json import dump, dumps, load
+from logging import getLogger
+from pathlib import Path
+
+from advent.lib.cache import cache_roots, find_cached, write_atomic
+from advent.lib.filename import decode
+from advent.lib.puzzle import extract_submit_message
+
+log = getLogger(__name__)
+
+# a delta rebuilds a page from the next newer version, as a list of either
+# [start, stop] to copy lines from the newer version, or literal text
+Delta = list[list[int] | str]
+
+
+@dataclass
+class Collection:
+    """The outcome of a garbage collection."""
+
+    size_before: int = 0
+    size_after: int = 0
+    compacted_answers: int = 0
+    compacted_pages: int = 0
+    duplicate_pages: int = 0
+    evicted_pages: int = 0
+
+
+def _diff(newer: str, older: str) -> Delta:
+    """Find the delta to rebuild a page from the next newer version.
+
+    Args:
+        newer (str): the newer version
+        older (str): the older version
+
+    Returns:
+        Delta: the delta
+    """
+    newer_lines = newer.splitlines(keepends=True)
+    older_lines = older.splitlines(keepends=True)
+    delta: Delta = []
+    matcher = SequenceMatcher(None, newer_lines, older_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append([i1, i2])
+        elif j2 > j1:
+            delta.append("".join(older_lines[j1:j2]))
+    return delta
+
+
+def _patch(newer: str, delta: Delta) -> str:
+    """Rebuild a page from the next newer version.
+
+    Args:
+        newer (str): the newer version
+        delta (Delta): the delta
+
+    Returns:
+        str: the older version
+    """
+    newer_lines = newer.splitlines(keepends=True)
+    return "".join(
+        op if isinstance(op, str) else "".join(newer_lines[op[0] : op[1]])
+        for op in delta
+    )
+
+
+def _history(page: Path) -> list[tuple[int, Path]]:
+    """List the history of a cached page, oldest first.
+
+    Args:
+        page (Path): the cached page
+
+    Returns:
+        list[tuple[int, Path]]: the time in nanoseconds and the path of each
+            version, saved either as html or a delta
+    """
+    folder = page.parent / "history"
+    if not folder.exists():
+        return []
+    return sorted(
+        (int(path.name.split(".")[0]), path)
+        for path in folder.iterdir()
+        if path.name.endswith((".html", ".delta.json"))
+    )
+
+
+def read_page_history(year: int, day: int, user: str = "default") -> list[str]:
+    """Read the previous versions of a cached puzzle page.
+
+    Args:
+        year (int): the year
+        day (int): the day
+        user (str): the user
+
+    Returns:
+        list[str]: the previous versions, newest first
+    """
+    page = find_cached(f"{user}/{year}/{day:02}/index.html")
+    if not page.exists():
+        return []
+    with page.open() as file:
+        newer = file.read()
+    found = []
+    for _, path in reversed(_history(page)):
+        with path.open() as file:
+            newer = file.read() if path.suffix == ".html" else _patch(newer, load(file))
+        found.append(newer)
+    return found
+
+
+def _compact_history(page: Path, collection: Collection) -> None:
+    """Convert the history of a page to deltas, removing duplicate versions.
+
+    Args:
+        page (Path): the cached page
+        collection (Collection): the collection to update
+    """
+    with page.open() as file:
+        newer = file.read()
+    for ns, path in reversed(_history(page)):
+        with path.open() as file:
+            older = file.read() if path.suffix == ".html" else _patch(newer, load(file))
+        if older == newer:
+            path.unlink()
+            collection.duplicate_pages += 1
+            continue
+        if path.suffix == ".html":
+            with (path.parent / f"{ns}.delta.json").open("w") as file:
+                dump(_diff(newer, older), file, separators=(",", ":"))
+            path.unlink()
+            collection.compacted_pages += 1
+        newer = older
+
+
+def _compact_answers(folder: Path, collection: Collection) -> None:
+    """Replace the submitted answer responses with their verdicts.
+
+    Args:
+        folder (Path): the folder of answers for a part
+        collection (Collection): the collection to update
+    """
+    path = folder / "verdicts.json"
+    verdicts: dict[str, str] = {}
+    if path.exists():
+        with path.open() as file:
+            verdicts = dict(load(file))
+
+    responses = sorted(folder.glob("*.html"), key=lambda x: x.stat().st_mtime)
+    for response in responses:
+        with response.open() as file:
+            verdicts.pop(decode(response.name[:-5]), None)
+            verdicts[decode(response.name[:-5])] = extract_submit_message(file.read())
+
+    # save the verdicts before removing the responses
+    if responses:
+        write_atomic(path, dumps(verdicts))
+        for response in responses:
+            response.unlink()
+        collection.compacted_answers += len(responses)
+
+
+def _size(root: Path) -> int:
+    """Find the total size of the files in a folder.
+
+    Args:
+        root (Path): the folder
+
+    Returns:
+        int: the size in bytes
+    """
+    return sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+
+
+def collect_garbage(budget: int) -> Collection:
+    """Compact the cache, and evict page history to keep within the budget.
+
+    Submitted answer responses are replaced by their verdicts, and previous
+    versions of pages are deduplicated and stored as deltas. If the cache is
+    still over budget, the oldest page history is evicted. Pages, inputs and
+    verdicts are never evicted. Both the shared cache and the project's
+    overlay are collected, with the budget covering them together.
+
+    Args:
+        budget (int): the size budget in bytes
+
+    Returns:
+        Collection: the outcome
+    """
+    roots = [root for root in cache_roots() if root.exists()]
+    collection = Collection(size_before=sum(_size(root) for root in roots))
+
+    for root in roots:
+        # lock files were kept next to the cached files by earlier versions
+        for lock in root.rglob(".*.lock"):
+            lock.unlink()
+        for folder in root.glob("*/*/*/answer/*"):
+            _compact_answers(folder, collection)
+        for page in root.glob("*/*/*/index.html"):
+            _compact_history(page, collection)
+
+    # evict the oldest history until within budget, by the time of the
+    # version rather than of the file, as compaction rewrites the newest
+    # deltas first, and each delta needs the next newer version
+    size = sum(_size(root) for root in roots)
+    for _, path in sorted(
+        version
+        for root in roots
+        for page in root.glob("*/*/*/index.html")
+        for version in _history(page)
+    ):
+        if size <= budget:
+            break
+        size -= path.stat().st_size
+        log.info(f"Evicting {path} from the cache")
+        path.unlink()
+        collection.evicted_pages += 1
+
+    collection.size_after = sum(_size(root) for root in roots)
+    return collection
+
+
+def _kind(parts: list[str]) -> str:
+    """Classify a file in the cache.
+
+    Args:
+        parts (list[str]): the path parts, relative to the user folder
+
+    Returns:
+        str: the kind of file
+    """
+    if parts[:1] == ["leaderboard"]:
+        return "leaderboard"
+    if len(parts) == 2 and parts[1] == "index.html":
+        return "calendar"
+    if len(parts) < 3:
+        return "other"
+    if parts[2] in ("answer", "history"):
+        return parts[2]
+    kinds = {"index.html": "page", "input.txt": "input", "examples.json": "examples"}
+    return kinds.get(parts[2], "other")
+
+
+def disk_usage() -> dict[tuple[str, str, str], int]:
+    """Measure the size of the shared cache and the project's overlay together.
+
+    Returns:
+        dict[tuple[str, str, str], int]: the size in bytes, by user, year and
+            kind of file
+    """
+    usage: dict[tuple[str, str, str], int] = {}
+    for root in cache_roots():
+        if root.exists():
+            for path in root.rglob("*"):
+                if path.is_file():
+                    user, *parts = path.relative_to(root).parts
+                    year = parts[0] if parts and parts[0].isdigit() else "-"
+                    key = (user, year, _kind(parts))
+                    usage[key] = usage.get(key, 0) + path.stat().st_size
+    return usage
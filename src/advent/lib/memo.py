@@ -0,0 +1,170 @@
+"""Disk backed memoization for solution functions."""
+from collections.abc import Callable
+from functools import cache, wraps
+from hashlib import sha256
+from inspect import getsource
+from logging import getLogger
+from os import utime
+from pathlib import Path
+from pickle import HIGHEST_PROTOCOL, dump, dumps, load
+from typing import Any, Literal, ParamSpec, TypeVar, cast
+
+from advent.lib.config import settings
+from advent.lib.puzzle import get_puzzle
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+Format = Literal["pickle", "numpy"]
+
+_extension: dict[Format, str] = {"pickle": "pickle", "numpy": "npy"}
+
+log = getLogger(__name__)
+
+
+@cache
+def _input_hash(year: int, day: int) -> str:
+    """Hash the puzzle input, which may have been replaced by an example.
+
+    Args:
+        year (int): the year
+        day (int): the day
+
+    Returns:
+        str: the hex digest
+    """
+    digest = sha256()
+    for chunk in get_puzzle(year, day).input_chunks():
+        digest.update(chunk.encode())
+    return digest.hexdigest()
+
+
+def _source_hash(function: Callable[..., Any]) -> str:
+    """Hash the source code of a function.
+
+    Args:
+        function (Callable[..., Any]): the function
+
+    Returns:
+        str: the hex digest
+    """
+    try:
+        source = getsource(function).encode()
+    except (OSError, TypeError):
+        source = function.__code__.co_code
+    return sha256(source).hexdigest()
+
+
+def _read(path: Path, fmt: Format) -> Any:  # noqa: ANN401
+    """Read a result from the store.
+
+    Args:
+        path (Path): the path
+        fmt (Format): the storage format
+
+    Returns:
+        Any: the stored result
+    """
+    if fmt == "numpy":
+        from numpy import load as load_numpy
+
+        return load_numpy(path, mmap_mode="r", allow_pickle=False)
+
+    with path.open("rb") as file:
+        return load(file)  # noqa: S301
+
+
+def _write(path: Path, fmt: Format, result: Any) -> None:  # noqa: ANN401
+    """Write a result to the store, replacing the file atomically.
+
+    Args:
+        path (Path): the path
+        fmt (Format): the storage format
+        result (Any): the result to store
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.tmp")
+    with temp.open("wb") as file:
+        if fmt == "numpy":
+            from numpy import save
+
+            save(file, result, allow_pickle=False)
+        else:
+            dump(result, file, protocol=HIGHEST_PROTOCOL)
+    temp.replace(path)
+
+
+def _evict(root: Path, budget: int) -> None:
+    """Remove the least recently used results until the store fits the budget.
+
+    Args:
+        root (Path): the root of the store
+        budget (int): the maximum total size, in bytes
+    """
+    files = sorted(
+        ((file.stat(), file) for file in root.rglob("*") if file.is_file()),
+        key=lambda x: x[0].st_mtime,
+    )
+    total = sum(stat.st_size for stat, _ in files)
+    for stat, file in files:
+        if total <= budget:
+            break
+        log.info(f"Evicting {file} from the memo store")
+        file.unlink(missing_ok=True)
+        total -= stat.st_size
+
+
+def memo(
+    year: int, day: int, fmt: Format = "pickle"
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Persist the results of a function between runs.
+
+    Results are stored under the tool path, keyed by the puzzle, the hash
+    of the cached puzzle input, the hash of the function source code and the
+    arguments, so changing any of them computes a fresh result. The store is
+    limited to the memo size budget, evicting the least recently used results.
+
+    Args:
+        year (int): the puzzle year
+        day (int): the puzzle day
+        fmt (Format): "pickle" for any picklable result, or "numpy" to save
+            a single array, which is memory mapped when loaded
+
+    Returns:
+        Callable[[Callable[P, R]], Callable[P, R]]: the decorator
+    """
+
+    def decorator(function: Callable[P, R]) -> Callable[P, R]:
+        source = _source_hash(function)
+
+        @wraps(function)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if not settings.memo_enabled:
+                return function(*args, **kwargs)
+
+            # find the path to the stored result
+            key = sha256()
+            key.update(_input_hash(year, day).encode())
+            key.update(source.encode())
+            key.update(dumps((args, sorted(kwargs.items())), protocol=4))
+            root = settings.tool_path / "memo"
+            path = (
+                root / f"{year}/{day:02}/{function.__qualname__}-{key.hexdigest()}"
+                f".{_extension[fmt]}"
+            )
+
+            # return the stored result, if available
+            if path.exists():
+                log.info(f"Memo hit for {function.__qualname__} in {path}")
+                utime(path)
+                return cast(R, _read(path, fmt))
+
+            # compute and store the result
+            result = function(*args, **kwargs)
+            _write(path, fmt, result)
+            _evict(root, settings.memo_max_size)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,219 @@
+"""Counters and histograms for the hot paths of the tool."""
+from atexit import register
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from json import dumps, loads
+from pathlib import Path
+from time import perf_counter
+from typing import Any
+
+from advent.lib.config import settings
+
+Labels = tuple[tuple[str, str], ...]
+
+# default histogram bucket upper bounds, in seconds
+_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+
+
+def _labels(labels: dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+@dataclass
+class Counter:
+    """A monotonically increasing count."""
+
+    name: str
+    description: str
+    values: dict[Labels, float] = field(default_factory=dict)
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        """Increment the counter.
+
+        Args:
+            amount (float): the amount to add
+            **labels (object): the labels of the value to increment
+        """
+        key = _labels(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+
+@dataclass
+class Histogram:
+    """A distribution of observed values."""
+
+    name: str
+    description: str
+    bounds: tuple[float, ...] = _TIME_BUCKETS
+    # per label set, the count in each bucket (plus +Inf), the sum and count
+    values: dict[Labels, tuple[list[int], float, int]] = field(default_factory=dict)
+
+    def observe(self, value: float, **labels: object) -> None:
+        """Record a value.
+
+        Args:
+            value (float): the value
+            **labels (object): the labels of the value
+        """
+        key = _labels(labels)
+        buckets, total, count = self.values.get(
+            key, ([0] * (len(self.bounds) + 1), 0.0, 0)
+        )
+        buckets[bisect_left(self.bounds, value)] += 1
+        self.values[key] = (buckets, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Record the time taken by a block of code.
+
+        Args:
+            **labels (object): the labels of the value
+
+        Yields:
+            None: control to the timed block
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start, **labels)
+
+
+cache_requests = Counter("advent_cache_requests", "Cache lookups by kind and result.")
+http_seconds = Histogram("advent_http_request_seconds", "HTTP request latency.")
+http_responses = Counter("advent_http_responses", "HTTP responses by status.")
+http_bytes = Counter("advent_http_response_bytes", "HTTP response body size.")
+limiter_seconds = Histogram("advent_limiter_wait_seconds", "Rate limiter delay.")
+parse_seconds = Histogram("advent_parse_seconds", "Puzzle page parsing time.")
+
+_metrics: list[Counter | Histogram] = [
+    cache_requests,
+    http_seconds,
+    http_responses,
+    http_bytes,
+    limiter_seconds,
+    parse_seconds,
+]
+
+
+def _records() -> Iterator[dict[str, Any]]:
+    """Convert the metrics recorded by this process into JSON records.
+
+    Yields:
+        Iterator[dict[str, Any]]: the records
+    """
+    time = datetime.now(tz=timezone.utc).isoformat()
+    for metric in _metrics:
+        for labels, value in metric.values.items():
+            record: dict[str, Any] = {
+                "time": time,
+                "name": metric.name,
+                "help": metric.description,
+                "labels": dict(labels),
+            }
+            if isinstance(metric, Counter):
+                record["type"] = "counter"
+                record["value"] = value
+            else:
+                buckets, total, count = value  # type: ignore[misc]
+                record["type"] = "histogram"
+                record["bounds"] = metric.bounds
+                record["buckets"] = buckets
+                record["sum"] = total
+                record["count"] = count
+            yield record
+
+
+@register
+def save() -> None:
+    """Append the metrics recorded by this process to the metrics file."""
+    if not settings.metrics_enabled:
+        return
+    lines = [dumps(record) for record in _records()]
+    if lines:
+        settings.tool_path.mkdir(parents=True, exist_ok=True)
+        with (settings.tool_path / "metrics.jsonl").open("a") as file:
+            file.write("\n".join(lines) + "\n")
+
+
+def load(path: Path) -> list[dict[str, Any]]:
+    """Load and merge the records in a metrics file.
+
+    Args:
+        path (Path): the JSON lines file
+
+    Returns:
+        list[dict[str, Any]]: one record per metric and label set
+    """
+    merged: dict[tuple[str, Labels], dict[str, Any]] = {}
+    if path.exists():
+        with path.open() as file:
+            for line in file:
+                record = loads(line)
+                key = (record["name"], _labels(record["labels"]))
+                if key not in merged:
+                    merged[key] = record
+                elif record["type"] == "counter":
+                    merged[key]["value"] += record["value"]
+                else:
+                    merged[key]["buckets"] = [
+                        x + y for x, y in zip(merged[key]["buckets"], record["buckets"])
+                    ]
+                    merged[key]["sum"] += record["sum"]
+                    merged[key]["count"] += record["count"]
+    return sorted(
+        merged.values(), key=lambda x: (x["name"], sorted(x["labels"].items()))
+    )
+
+
+def _sample(name: str, labels: dict[str, object], value: float) -> str:
+    """Format an OpenMetrics sample.
+
+    Args:
+        name (str): the sample name
+        labels (dict[str, object]): the labels
+        value (float): the value
+
+    Returns:
+        str: the sample line
+    """
+    if labels:
+        text = ",".join(f'{key}="{label}"' for key, label in labels.items())
+        return f"{name}{{{text}}} {value}"
+    return f"{name} {value}"
+
+
+def to_openmetrics(records: list[dict[str, Any]]) -> str:
+    """Format merged records in the OpenMetrics text format.
+
+    Args:
+        records (list[dict[str, Any]]): the merged records
+
+    Returns:
+        str: the OpenMetrics exposition
+    """
+    lines: list[str] = []
+    described: set[str] = set()
+    for record in records:
+        name, labels = record["name"], record["labels"]
+        if name not in described:
+            described.add(name)
+            lines.append(f"# TYPE {name} {record['type']}")
+            lines.append(f"# HELP {name} {record['help']}")
+
+        if record["type"] == "counter":
+            lines.append(_sample(f"{name}_total", labels, record["value"]))
+        else:
+            cumulative = 0
+            for bound, count in zip([*record["bounds"], "+Inf"], record["buckets"]):
+                cumulative += count
+                lines.append(
+                    _sample(f"{name}_bucket", {**labels, "le": bound}, cumulative)
+                )
+            lines.append(_sample(f"{name}_sum", labels, record["sum"]))
+            lines.append(_sample(f"{name}_count", labels, record["count"]))
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
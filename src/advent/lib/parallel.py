@@ -0,0 +1,302 @@
+"""Parallel map and reduce, sharing the puzzle with the workers."""
+from collections.abc import Callable, Iterable, Mapping
+from functools import partial, reduce
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+from typing import Any, TypeVar
+
+from advent.lib.cache import find_cached, get_puzzle_page
+from advent.lib.puzzle import Puzzle, get_puzzle
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# a block of shared memory, as (name, size in bytes)
+_Block = tuple[str, int]
+
+# the arrays attached by a worker, as name -> (array, shared memory)
+_arrays: dict[str, tuple[Any, SharedMemory]] = {}
+
+# the puzzle input attached by a worker, with its shared memory
+_input: tuple[memoryview, SharedMemory] | None = None
+
+
+def shared_array(name: str) -> Any:  # noqa: ANN401
+    """Get a NumPy array shared with the workers by pmap or preduce.
+
+    The array is a read only view of the shared memory, so it is not copied.
+
+    Args:
+        name (str): the name of the array
+
+    Returns:
+        Any: the array
+
+    Raises:
+        KeyError: Raised if there is no array with this name
+    """
+    if name not in _arrays:
+        raise KeyError(name)
+    return _arrays[name][0]
+
+
+def shared_input() -> memoryview:
+    """Get the puzzle input shared with the workers by pmap or preduce.
+
+    The input is a read only view of its UTF-8 bytes in shared memory, so it
+    is not copied. Parse it in place, such as with bytes.split or NumPy's
+    frombuffer, or decode it with str(view, "utf-8").
+
+    Returns:
+        memoryview: the puzzle input
+
+    Raises:
+        LookupError: Raised if no puzzle was shared with the workers
+    """
+    if _input is None:
+        message = "no puzzle was shared with the workers"
+        raise LookupError(message)
+    return _input[0]
+
+
+def _share(data: bytes | memoryview) -> tuple[SharedMemory, _Block]:
+    """Copy data to a new block of shared memory.
+
+    Args:
+        data (bytes | memoryview): the data
+
+    Returns:
+        tuple[SharedMemory, _Block]: the shared memory, and its name and size
+    """
+    # shared memory can't be empty, and may be larger than requested
+    memory = SharedMemory(create=True, size=max(1, len(data)))
+    memory.buf[: len(data)] = data
+    return memory, (memory.name, len(data))
+
+
+def _attach(block: _Block) -> tuple[memoryview, SharedMemory]:
+    """Attach to a block of shared memory.
+
+    Args:
+        block (_Block): the name and size of the block
+
+    Returns:
+        tuple[memoryview, SharedMemory]: a read only view of the data, and the
+            shared memory, which must be kept open while the view is used
+    """
+    name, size = block
+    memory = SharedMemory(name=name)
+    return memory.buf[:size].toreadonly(), memory
+
+
+def _initialize(
+    puzzle: tuple[int, int, _Block | None, _Block] | None,
+    arrays: dict[str, tuple[_Block, tuple[int, ...], str]],
+) -> None:
+    """Attach a worker to the shared memory.
+
+    Args:
+        puzzle (tuple[int, int, _Block | None, _Block] | None): the year, day,
+            page and input of the puzzle, if shared
+        arrays (dict[str, tuple[_Block, tuple[int, ...], str]]): the block,
+            shape and dtype of each shared array
+    """
+    global _input
+    if puzzle is not None:
+        year, day, page, text = puzzle
+        shared = get_puzzle(year, day)
+        if page is not None:
+            view, memory = _attach(page)
+            shared.preload(str(view, "utf-8"))
+            view.release()
+            memory.close()
+        _input = _attach(text)
+        shared.preload_input(_input[0])
+
+    if arrays:
+        from numpy import ndarray
+
+        for name, ((block, _), shape, dtype) in arrays.items():
+            memory = SharedMemory(name=block)
+            array = ndarray(shape, dtype, buffer=memory.buf)
+            array.flags.writeable = False
+            _arrays[name] = (array, memory)
+
+
+def _reduce_chunk(
+    function: Callable[[T], R],
+    reducer: Callable[[R, R], R],
+    initial: R,
+    chunk: list[T],
+) -> R:
+    """Map and reduce a chunk of items, in a worker.
+
+    Args:
+        function (Callable[[T], R]): the function to map
+        reducer (Callable[[R, R], R]): the function to reduce
+        initial (R): the initial value
+        chunk (list[T]): the items
+
+    Returns:
+        R: the reduced value
+    """
+    return reduce(reducer, map(function, chunk), initial)
+
+
+def _run(
+    task: Callable[[Any], R],
+    items: list[Any],
+    puzzle: Puzzle | None,
+    arrays: Mapping[str, Any] | None,
+    chunksize: int,
+    ordered: bool,
+    processes: int,
+) -> list[R]:
+    """Run a task on the items in a pool of workers, sharing the puzzle and arrays.
+
+    Args:
+        task (Callable[[Any], R]): the task
+        items (list[Any]): the items
+        puzzle (Puzzle | None): the puzzle to share
+        arrays (Mapping[str, Any] | None): the arrays to share
+        chunksize (int): the number of items sent to a worker at a time
+        ordered (bool): if False, the results are in order of completion
+        processes (int): the number of workers
+
+    Returns:
+        list[R]: the results
+    """
+    blocks: list[SharedMemory] = []
+    try:
+        shared_puzzle = None
+        if puzzle is not None:
+            # the page is only shared if cached, so workers needing only the
+            # input never wait for a download
+            page_block = None
+            if find_cached(
+                f"default/{puzzle.year}/{puzzle.day:02}/index.html"
+            ).exists():
+                html = get_puzzle_page(puzzle.year, puzzle.day)
+                page, page_block = _share(html.encode())
+                blocks.append(page)
+            text, text_block = _share(puzzle.input_file.encode())
+            blocks.append(text)
+            shared_puzzle = (puzzle.year, puzzle.day, page_block, text_block)
+
+        shared_arrays = {}
+        if arrays:
+            from numpy import ascontiguousarray
+
+            for name, array in arrays.items():
+                contiguous = ascontiguousarray(array)
+                memory, block = _share(contiguous.data.cast("B"))
+                blocks.append(memory)
+                shared_arrays[name] = (block, contiguous.shape, contiguous.dtype.str)
+
+        with Pool(processes, _initialize, (shared_puzzle, shared_arrays)) as pool:
+            if ordered:
+                return list(pool.imap(task, items, chunksize))
+            return list(pool.imap_unordered(task, items, chunksize))
+    finally:
+        for memory in blocks:
+            memory.close()
+            memory.unlink()
+
+
+def _chunksize(count: int, processes: int) -> int:
+    """Choose a chunk size giving each worker about four chunks.
+
+    Args:
+        count (int): the number of items
+        processes (int): the number of workers
+
+    Returns:
+        int: the chunk size
+    """
+    return max(1, -(-count // (processes * 4)))
+
+
+def pmap(
+    function: Callable[[T], R],
+    items: Iterable[T],
+    puzzle: Puzzle | None = None,
+    arrays: Mapping[str, Any] | None = None,
+    chunksize: int | None = None,
+    ordered: bool = True,
+    processes: int | None = None,
+) -> list[R]:
+    """Map a function over the items, using a pool of worker processes.
+
+    The puzzle input, and the page if cached, are copied to shared memory
+    once, rather than sent with every item, and each worker primes the puzzle
+    with them, so load_puzzle(year, day) in the function doesn't read the
+    cache again. The input is read in the function with shared_input(),
+    without copying, and is only decoded by a worker if used as a string.
+    NumPy arrays are shared the same way, and read in the function with
+    shared_array(name), without copying.
+
+    The function must be picklable, such as a module level function.
+
+    Args:
+        function (Callable[[T], R]): the function
+        items (Iterable[T]): the items
+        puzzle (Puzzle | None): the puzzle to share with the workers
+        arrays (Mapping[str, Any] | None): NumPy arrays to share, by name
+        chunksize (int | None): the number of items sent to a worker at a
+            time, by default giving each worker about four chunks
+        ordered (bool): if False, return the results in order of completion
+        processes (int | None): the number of workers, by default the number
+            of CPUs
+
+    Returns:
+        list[R]: the results
+    """
+    items = list(items)
+    processes = processes or cpu_count() or 1
+    chunksize = chunksize or _chunksize(len(items), processes)
+    return _run(function, items, puzzle, arrays, chunksize, ordered, processes)
+
+
+def preduce(
+    function: Callable[[T], R],
+    reducer: Callable[[R, R], R],
+    items: Iterable[T],
+    initial: R,
+    puzzle: Puzzle | None = None,
+    arrays: Mapping[str, Any] | None = None,
+    chunksize: int | None = None,
+    ordered: bool = True,
+    processes: int | None = None,
+) -> R:
+    """Map a function over the items and reduce the results, in parallel.
+
+    Each worker reduces a chunk of results, so only one value per chunk is
+    sent back, then the chunks are reduced. The initial value starts every
+    chunk, so it must be an identity for the reducer, such as 0 for addition.
+    The puzzle and arrays are shared as in pmap.
+
+    Args:
+        function (Callable[[T], R]): the function
+        reducer (Callable[[R, R], R]): the reducer, such as operator.add
+        items (Iterable[T]): the items
+        initial (R): the initial value
+        puzzle (Puzzle | None): the puzzle to share with the workers
+        arrays (Mapping[str, Any] | None): NumPy arrays to share, by name
+        chunksize (int | None): the number of items reduced by a worker at a
+            time, by default giving each worker about four chunks
+        ordered (bool): if False, reduce the chunks in order of completion,
+            which requires a commutative reducer
+        processes (int | None): the number of workers, by default the number
+            of CPUs
+
+    Returns:
+        R: the reduced value
+    """
+    items = list(items)
+    processes = processes or cpu_count() or 1
+    chunksize = chunksize or _chunksize(len(items), processes)
+    chunks = [items[i : i + chunksize] for i in range(0, len(items), chunksize)]
+    task = partial(_reduce_chunk, function, reducer, initial)
+    results = _run(task, chunks, puzzle, arrays, 1, ordered, processes)
+    return reduce(reducer, results, initial)
@@ -0,0 +1,71 @@
+"""Parsing of the puzzle pages, shared by the puzzle and the search index."""
+from re import finditer
+
+from bs4 import BeautifulSoup, Tag
+from markdownify import ATX, BACKSLASH, MarkdownConverter  # type: ignore
+
+from advent.lib.metrics import parse_seconds
+
+md = MarkdownConverter(
+    heading_style=ATX,
+    wrap=True,
+    wrap_width=80,
+    newline_style=BACKSLASH,
+)
+
+
+def parse_html(html: str) -> BeautifulSoup:
+    """Parse html, recording the time taken.
+
+    Args:
+        html (str): the html
+
+    Returns:
+        BeautifulSoup: the parsed html
+    """
+    with parse_seconds.time(stage="soup"):
+        return BeautifulSoup(html, "html.parser")
+
+
+def to_markdown(element: Tag) -> str:
+    """Convert an html element to markdown, recording the time taken.
+
+    Args:
+        element (Tag): the element
+
+    Returns:
+        str: the markdown
+    """
+    with parse_seconds.time(stage="markdown"):
+        return str(md.convert_soup(element))
+
+
+def page_title(soup: BeautifulSoup) -> str:
+    """Find the puzzle title in a puzzle page.
+
+    Args:
+        soup (BeautifulSoup): the parsed page
+
+    Returns:
+        str: the title
+    """
+    return next(
+        m["title"].replace('"', "'")
+        for heading in soup.find_all("h2")
+        for m in finditer(r"--- Day (?:\d+): (?P<title>.+) ---", heading.string)
+    )
+
+
+def page_descriptions(soup: BeautifulSoup) -> list[str]:
+    """Convert the descriptions of each part in a puzzle page to markdown.
+
+    Args:
+        soup (BeautifulSoup): the parsed page
+
+    Returns:
+        list[str]: the descriptions of the parts released so far
+    """
+    return [
+        to_markdown(article)
+        for article in soup.find_all("article", attrs={"class": "day-desc"})
+    ]
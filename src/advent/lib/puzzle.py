@@ -1,30 +1,60 @@
 """Puzzle Class."""
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass
 from enum import Enum, unique
-from functools import cached_property
+from functools import lru_cache
+from io import StringIO
 from logging import getLogger
-from re import finditer
+from os import environ
+from pathlib import Path
+from typing import Any, Generic, TextIO, TypeVar
 
-from bs4 import BeautifulSoup
 from colorama import Fore, Style
-from markdownify import ATX, BACKSLASH, MarkdownConverter  # type: ignore
 
 from advent.lib.cache import (
     get_puzzle_input,
+    get_puzzle_input_path,
     get_puzzle_page,
     lookup_answers,
+    lookup_verdicts,
     post_puzzle_answer,
+    read_examples,
+    read_puzzle_pages,
+    save_examples,
 )
 from advent.lib.config import settings
+from advent.lib.parse import page_descriptions, page_title, parse_html, to_markdown
 from advent.lib.part import PART_ONE, PART_TWO, Part
 
+T = TypeVar("T")
+
 log = getLogger(__name__)
 
-md = MarkdownConverter(
-    heading_style=ATX,
-    wrap=True,
-    wrap_width=80,
-    newline_style=BACKSLASH,
-)
+
+class _CachedSlot(Generic[T]):
+    """Like functools.cached_property, but caching in the slot named {name}_cache.
+
+    Deleting the attribute clears the cached value, if there is one.
+    """
+
+    def __init__(self, function: Callable[[Any], T]) -> None:
+        self.function = function
+        self.slot = f"{function.__name__}_cache"
+        self.__doc__ = function.__doc__
+
+    def __get__(self, instance: object, owner: type | None = None) -> T:
+        if instance is None:
+            return self  # type: ignore[return-value]
+        try:
+            return getattr(instance, self.slot)  # type: ignore[no-any-return]
+        except AttributeError:
+            value = self.function(instance)
+            setattr(instance, self.slot, value)
+            return value
+
+    def __delete__(self, instance: object) -> None:
+        if hasattr(instance, self.slot):
+            delattr(instance, self.slot)
 
 
 @unique
@@ -38,54 +68,102 @@ class AnswerStatus(Enum):
     INCORRECT = "incorrect"
 
 
+def extract_submit_message(html: str) -> str:
+    """Extract the message from the submit html.
+
+    Args:
+        html (str): the html to parse
+
+    Returns:
+        str: the message
+    """
+    article = parse_html(html).article
+    if article and article.p:
+        return to_markdown(article.p).split(".")[0]
+    return ""
+
+
+@dataclass(frozen=True)
+class Example:
+    """An example input from the puzzle description, with its answer."""
+
+    part: Part
+    input: str  # noqa: A003
+    answer: str
+
+
+def input_variable(year: int, day: int) -> str:
+    """The environment variable used to replace the input for a puzzle.
+
+    Args:
+        year (int): the year
+        day (int): the day
+
+    Returns:
+        str: the environment variable name
+    """
+    return f"ADVENT_INPUT_{year}_{day:02}"
+
+
 class Puzzle:
     """Puzzle Class."""
 
-    def __init__(self, year: int, day: int) -> None:
+    __slots__ = (
+        "year",
+        "day",
+        "input_path",
+        "page_url",
+        "input_url",
+        "answer_url",
+        "title_cache",
+        "descriptions_cache",
+        "answers_cache",
+        "submitted_cache",
+        "examples_cache",
+        "input_file_cache",
+        "_html_cache",
+        "_input_buffer",
+    )
+
+    def __init__(self, year: int, day: int, input_path: Path | None = None) -> None:
         """Initializer.
 
         Args:
             year (int): the puzzle year
             day (int): the puzzle day
+            input_path (Path | None): if given, read the input from this file
+                rather than the cache
         """
         self.year = year
         self.day = day
+        self.input_path = input_path
         self.page_url = f"{settings.http_root}/{self.year}/day/{self.day}"
         self.input_url = f"{settings.http_root}/{self.year}/day/{self.day}/input"
         self.answer_url = f"{settings.http_root}/{self.year}/day/{self.day}/answer"
 
-    @cached_property
+    @_CachedSlot
     def title(self) -> str:
         """Puzzle Title.
 
         Returns:
             str: the puzzle title
         """
-        return next(
-            m["title"].replace('"', "'")
-            for heading in BeautifulSoup(self._html, "html.parser").find_all("h2")
-            for m in finditer(r"--- Day (?:\d+): (?P<title>.+) ---", heading.string)
-        )
+        return page_title(parse_html(self._html))
 
-    @cached_property
+    @_CachedSlot
     def descriptions(self) -> dict[Part, str | None]:
         """The puzzle desciptions for part one and part two, in markdown format.
 
         Returns:
             dict[Part, str | None]: the descriptions
         """
-        found = [
-            md.convert_soup(article)
-            for article in BeautifulSoup(self._html, "html.parser").find_all(
-                "article", attrs={"class": "day-desc"}
-            )
-        ]
+        found = page_descriptions(parse_html(self._html))
         return {
             PART_ONE: found[0] if len(found) >= 1 else None,
             PART_TWO: found[1] if len(found) == 2 else None,
         }
 
-    @cached_property
+    @_CachedSlot
     def answers(self) -> dict[Part, str | None]:
         """The accepted answers for part one and part two.
 
@@ -94,7 +172,7 @@ class Puzzle:
         """
         found = [
             p.code.string
-            for p in BeautifulSoup(self._html, "html.parser").find_all("p")
+            for p in parse_html(self._html).find_all("p")
             if p.text.startswith("Your puzzle answer was")
         ]
         return {
@@ -102,23 +180,7 @@ class Puzzle:
             PART_TWO: found[1] if len(found) == 2 else None,
         }
 
-    def _extract_submit_message(self, html: str) -> str:
-        """Extract the message form the submit html.
-
-        Args:
-            html (str): the html to parse
-
-        Returns:
-            str: the message
-        """
-        article = BeautifulSoup(html, "html.parser").article
-        if article:
-            text = md.convert_soup(article.p)
-            if isinstance(text, str):
-                return text.split(".")[0]
-        return ""
-
-    @cached_property
+    @_CachedSlot
     def submitted(self) -> dict[Part, dict[str, str]]:
         """Lookup the submitted answers in the cache.
 
@@ -127,12 +189,63 @@ class Puzzle:
         """
         return {
             part: {
-                answer: self._extract_submit_message(html)
-                for answer, html in lookup_answers(self.year, self.day, part).items()
+                **lookup_verdicts(self.year, self.day, part),
+                **{
+                    answer: extract_submit_message(html)
+                    for answer, html in lookup_answers(
+                        self.year, self.day, part
+                    ).items()
+                },
             }
             for part in Part
         }
 
+    @_CachedSlot
+    def examples(self) -> list[Example]:
+        """The example inputs from the descriptions, with their answers.
+
+        The first example input in each part is paired with the last
+        emphasised answer in that part. Part two uses the part one example
+        input if it doesn't have its own.
+
+        Returns:
+            list[Example]: the examples
+        """
+        cached = read_examples(self.year, self.day)
+        if cached is not None:
+            return [
+                Example(Part(example["part"]), example["input"], example["answer"])
+                for example in cached
+            ]
+
+        found = []
+        example_input = None
+        articles = parse_html(self._html).find_all(
+            "article", attrs={"class": "day-desc"}
+        )
+        for part, article in zip(Part, articles):
+            pre = article.find("pre")
+            if pre:
+                example_input = pre.get_text()
+            answers = [
+                code.get_text()
+                for code in article.find_all("code")
+                if (code.find("em") or code.find_parent("em"))
+                and not code.find_parent("pre")
+            ]
+            if example_input and answers:
+                found.append(Example(part, example_input, answers[-1]))
+
+        save_examples(
+            self.year,
+            self.day,
+            [
+                {"part": x.part.value, "input": x.input, "answer": x.answer}
+                for x in found
+            ],
+        )
+        return found
+
     def submit(self, part: Part, answer: int | str | None) -> None:  # noqa: C901
         """Submit an answer.
 
@@ -152,7 +265,7 @@ class Puzzle:
         # check if this answer appears as one of the examples
         if str(answer) in [
             code.text
-            for article in BeautifulSoup(self._html, "html.parser").find_all(
+            for article in parse_html(self._html).find_all(
                 "article", attrs={"class": "day-desc"}
             )
             for code in article.find_all("code")
@@ -212,36 +325,185 @@ class Puzzle:
 
         # submit the results (or get the cached result)
         html = post_puzzle_answer(self.year, self.day, part, str(answer), refresh=True)
-        self.__dict__.pop("submitted", None)
+        del self.submitted
 
         # print and log the message
         print(f"Submitted {self.year} {self.day} {part_str}: {answer}")
 
-        message = self._extract_submit_message(html)
+        message = extract_submit_message(html)
         color = Fore.GREEN if "That's the right answer!" in message else Fore.RED
         print(f"{color}{message}{Style.RESET_ALL}")
 
         if "That's the right answer!" in message:
             self.refresh()
 
-    @cached_property
+    @_CachedSlot
     def input_file(self) -> str:
         """The puzzle input file.
 
         Returns:
             str: the file
         """
+        if hasattr(self, "_input_buffer"):
+            return str(self._input_buffer, "utf-8")
+        if self.input_path is not None:
+            with self.input_path.open() as file:
+                return file.read()
         return get_puzzle_input(self.year, self.day)
 
-    @cached_property
+    def open_input(self) -> TextIO:
+        """Open the puzzle input for streaming, without reading it all into memory.
+
+        Returns:
+            TextIO: the input, to be used as a context manager
+        """
+        if hasattr(self, "input_file_cache"):
+            return StringIO(self.input_file)
+        if hasattr(self, "_input_buffer"):
+            return StringIO(str(self._input_buffer, "utf-8"))
+        if self.input_path is not None:
+            return self.input_path.open()
+        return get_puzzle_input_path(self.year, self.day).open()
+
+    def input_lines(self) -> Iterator[str]:
+        """Stream the puzzle input a line at a time.
+
+        Yields:
+            str: each line, without the line ending
+        """
+        with self.open_input() as file:
+            for line in file:
+                yield line.rstrip("\n")
+
+    def input_chunks(self, size: int = 1024 * 1024) -> Iterator[str]:
+        """Stream the puzzle input in chunks.
+
+        Args:
+            size (int): the number of characters in each chunk
+
+        Yields:
+            str: each chunk
+        """
+        with self.open_input() as file:
+            while chunk := file.read(size):
+                yield chunk
+
+    @property
+    def input_size(self) -> int:
+        """The size of the puzzle input, without reading it.
+
+        Returns:
+            int: the size in bytes
+        """
+        if hasattr(self, "input_file_cache"):
+            return len(self.input_file.encode())
+        if hasattr(self, "_input_buffer"):
+            return len(self._input_buffer)
+        if self.input_path is not None:
+            return self.input_path.stat().st_size
+        return get_puzzle_input_path(self.year, self.day).stat().st_size
+
+    @_CachedSlot
     def _html(self) -> str:
         return get_puzzle_page(self.year, self.day)
 
+    def preload(self, html: str) -> None:
+        """Use a puzzle page that has already been read from the cache.
+
+        Args:
+            html (str): the puzzle page
+        """
+        if not hasattr(self, "_html_cache"):
+            self._html_cache = html
+
+    def preload_input(self, text: str | memoryview) -> None:
+        """Use a puzzle input that has already been read, such as from shared memory.
+
+        Args:
+            text (str | memoryview): the puzzle input, or its UTF-8 bytes, which
+                are only decoded if the input is used as a string
+        """
+        if isinstance(text, memoryview):
+            self._input_buffer = text
+        elif not hasattr(self, "input_file_cache"):
+            self.input_file_cache = text
+
     def refresh(self) -> None:
         """Force refresh the puzzle in the cache."""
         get_puzzle_page(self.year, self.day, refresh=True)
-        self.__dict__.pop("_html", None)
-        self.__dict__.pop("title", None)
-        self.__dict__.pop("descriptions", None)
-        self.__dict__.pop("answers", None)
-        self.__dict__.pop("submitted", None)
+        del self._html, self.title, self.descriptions, self.answers, self.submitted
+        del self.examples
+
+
+@lru_cache(maxsize=128)
+def get_puzzle(year: int, day: int, input_path: Path | None = None) -> Puzzle:
+    """Get a puzzle from the registry of recently used puzzles.
+
+    The input is replaced by the file named in the puzzle's input environment
+    variable, if set, which is used to run solutions on the examples.
+
+    Args:
+        year (int): the year
+        day (int): the day
+        input_path (Path | None): if given, read the input from this file
+
+    Returns:
+        Puzzle: the puzzle
+    """
+    if input_path is None and input_variable(year, day) in environ:
+        input_path = Path(environ[input_variable(year, day)])
+    return Puzzle(year, day, input_path)
+
+
+class PuzzleYear(Mapping[int, Puzzle]):
+    """The puzzles for a year, mapping day to puzzle.
+
+    The cached puzzle pages for all of the days are read together on the
+    first access, and each puzzle is created as it is requested.
+    """
+
+    def __init__(self, year: int) -> None:
+        """Initializer.
+
+        Args:
+            year (int): the year
+        """
+        self.year = year
+        self._pages: dict[int, str] | None = None
+
+    def __getitem__(self, day: int) -> Puzzle:
+        """Get the puzzle for a day.
+
+        Args:
+            day (int): the day
+
+        Returns:
+            Puzzle: the puzzle
+
+        Raises:
+            KeyError: Raised if the day is not between 1 and 25
+        """
+        if day not in range(1, 26):
+            raise KeyError(day)
+        if self._pages is None:
+            self._pages = read_puzzle_pages(self.year)
+        puzzle = get_puzzle(self.year, day)
+        if day in self._pages:
+            puzzle.preload(self._pages.pop(day))
+        return puzzle
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the days.
+
+        Returns:
+            Iterator[int]: the days
+        """
+        return iter(range(1, 26))
+
+    def __len__(self) -> int:
+        """The number of days.
+
+        Returns:
+            int: the number of days
+        """
+        return 25
@@ -0,0 +1,473 @@
+"""Sets of integer intervals and boxes, for range splitting puzzles.
+
+Intervals are half open, so (2, 5) holds 2, 3 and 4, and a box is a tuple
+of intervals, one for each dimension.
+"""
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable, Iterator
+from heapq import merge
+from math import prod
+
+Interval = tuple[int, int]
+Box = tuple[Interval, ...]
+
+
+def _merge_sorted(intervals: Iterable[Interval]) -> tuple[list[int], list[int]]:
+    """Merge intervals sorted by start, where they overlap or touch.
+
+    Args:
+        intervals (Iterable[Interval]): the sorted intervals
+
+    Returns:
+        tuple[list[int], list[int]]: the starts and stops of the merged intervals
+    """
+    starts: list[int] = []
+    stops: list[int] = []
+    for start, stop in intervals:
+        if start >= stop:
+            continue
+        if stops and start <= stops[-1]:
+            stops[-1] = max(stops[-1], stop)
+        else:
+            starts.append(start)
+            stops.append(stop)
+    return starts, stops
+
+
+class IntervalSet:
+    """An immutable set of integers, held as sorted, disjoint intervals.
+
+    The starts and stops of the intervals are held in two sorted lists, so
+    membership is found by bisection in O(log n), and the set operations
+    merge the lists in O(n + m).
+    """
+
+    __slots__ = ("_starts", "_stops")
+
+    def __init__(self, intervals: Iterable[Interval] = ()) -> None:
+        """Initializer.
+
+        Args:
+            intervals (Iterable[Interval]): the intervals, which may overlap
+        """
+        # sorting is linear for intervals that are already sorted
+        self._starts, self._stops = _merge_sorted(sorted(intervals))
+
+    def __contains__(self, point: object) -> bool:
+        """Test if a point is in the set.
+
+        Args:
+            point (object): the point
+
+        Returns:
+            bool: True if the point is in the set
+        """
+        if not isinstance(point, int):
+            return False
+        index = bisect_right(self._starts, point) - 1
+        return index >= 0 and point < self._stops[index]
+
+    def __iter__(self) -> Iterator[Interval]:
+        """Iterate over the intervals, in order.
+
+        Returns:
+            Iterator[Interval]: the intervals
+        """
+        return zip(self._starts, self._stops)
+
+    def __len__(self) -> int:
+        """The number of intervals.
+
+        Returns:
+            int: the number of intervals
+        """
+        return len(self._starts)
+
+    def __eq__(self, other: object) -> bool:
+        """Test if two sets are equal.
+
+        Args:
+            other (object): the other set
+
+        Returns:
+            bool: True if the sets hold the same integers
+        """
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self._starts == other._starts and self._stops == other._stops
+
+    def __hash__(self) -> int:
+        """Hash the set.
+
+        Returns:
+            int: the hash
+        """
+        return hash((tuple(self._starts), tuple(self._stops)))
+
+    def __repr__(self) -> str:
+        """Represent the set.
+
+        Returns:
+            str: the representation
+        """
+        return f"IntervalSet({list(self)})"
+
+    @property
+    def size(self) -> int:
+        """The number of integers in the set.
+
+        Returns:
+            int: the size
+        """
+        return sum(self._stops) - sum(self._starts)
+
+    @property
+    def bounds(self) -> Interval | None:
+        """The interval spanning the set.
+
+        Returns:
+            Interval | None: the bounds, or None if the set is empty
+        """
+        return (self._starts[0], self._stops[-1]) if self._starts else None
+
+    def overlapping(self, start: int, stop: int) -> "IntervalSet":
+        """Find the part of the set within an interval, in O(log n + k).
+
+        Args:
+            start (int): the start of the interval
+            stop (int): the stop of the interval
+
+        Returns:
+            IntervalSet: the part of the set within the interval
+        """
+        first = bisect_right(self._stops, start)
+        last = bisect_left(self._starts, stop)
+        return IntervalSet(
+            (max(a, start), min(b, stop))
+            for a, b in zip(self._starts[first:last], self._stops[first:last])
+        )
+
+    def __or__(self, other: "IntervalSet") -> "IntervalSet":
+        """The union of two sets.
+
+        Args:
+            other (IntervalSet): the other set
+
+        Returns:
+            IntervalSet: the union
+        """
+        return IntervalSet(merge(self, other))
+
+    def __and__(self, other: "IntervalSet") -> "IntervalSet":
+        """The intersection of two sets.
+
+        Args:
+            other (IntervalSet): the other set
+
+        Returns:
+            IntervalSet: the intersection
+        """
+        found = []
+        i = j = 0
+        while i < len(self) and j < len(other):
+            start = max(self._starts[i], other._starts[j])
+            stop = min(self._stops[i], other._stops[j])
+            if start < stop:
+                found.append((start, stop))
+            if self._stops[i] < other._stops[j]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet(found)
+
+    def __sub__(self, other: "IntervalSet") -> "IntervalSet":
+        """The difference of two sets.
+
+        Args:
+            other (IntervalSet): the other set
+
+        Returns:
+            IntervalSet: the integers in this set, but not the other
+        """
+        found = []
+        j = 0
+        for start, stop in self:
+            # skip the intervals of the other set ending before this one
+            while j < len(other) and other._stops[j] <= start:
+                j += 1
+            k = j
+            while k < len(other) and other._starts[k] < stop:
+                if other._starts[k] > start:
+                    found.append((start, other._starts[k]))
+                start = max(start, other._stops[k])
+                k += 1
+            if start < stop:
+                found.append((start, stop))
+        return IntervalSet(found)
+
+    def __xor__(self, other: "IntervalSet") -> "IntervalSet":
+        """The symmetric difference of two sets.
+
+        Args:
+            other (IntervalSet): the other set
+
+        Returns:
+            IntervalSet: the integers in exactly one of the sets
+        """
+        return (self - other) | (other - self)
+
+
+class RangeMap:
+    """A piecewise function adding an offset to each of a set of intervals.
+
+    Points outside every interval map to themselves. For a map given as
+    "destination source length", the piece is
+    (source, source + length, destination - source).
+    """
+
+    __slots__ = ("_starts", "_stops", "_offsets")
+
+    def __init__(self, pieces: Iterable[tuple[int, int, int]]) -> None:
+        """Initializer.
+
+        Args:
+            pieces (Iterable[tuple[int, int, int]]): the start, stop and
+                offset of each piece, which must not overlap
+
+        Raises:
+            ValueError: Raised if the pieces overlap
+        """
+        ordered = sorted(piece for piece in pieces if piece[0] < piece[1])
+        self._starts = [start for start, _, _ in ordered]
+        self._stops = [stop for _, stop, _ in ordered]
+        self._offsets = [offset for _, _, offset in ordered]
+        if any(a > b for a, b in zip(self._stops, self._starts[1:])):
+            message = "the pieces of a RangeMap must not overlap"
+            raise ValueError(message)
+
+    def __call__(self, point: int) -> int:
+        """Map a point, in O(log n).
+
+        Args:
+            point (int): the point
+
+        Returns:
+            int: the mapped point
+        """
+        index = bisect_right(self._starts, point) - 1
+        if index >= 0 and point < self._stops[index]:
+            return point + self._offsets[index]
+        return point
+
+    def image(self, intervals: IntervalSet) -> IntervalSet:
+        """Map a set of integers, splitting its intervals at the pieces.
+
+        Args:
+            intervals (IntervalSet): the set
+
+        Returns:
+            IntervalSet: the mapped set
+        """
+        found = []
+        for start, stop in intervals:
+            index = max(0, bisect_right(self._stops, start))
+            while start < stop:
+                if index < len(self._starts) and self._starts[index] <= start:
+                    # inside a piece
+                    end = min(stop, self._stops[index])
+                    offset = self._offsets[index]
+                    found.append((start + offset, end + offset))
+                    index += 1
+                else:
+                    # in a gap, before the next piece
+                    end = stop
+                    if index < len(self._starts):
+                        end = min(stop, self._starts[index])
+                    found.append((start, end))
+                start = end
+        return IntervalSet(found)
+
+
+def _box_difference(box: Box, other: Box) -> Iterator[Box]:
+    """Split a box into the disjoint boxes outside another box.
+
+    Args:
+        box (Box): the box
+        other (Box): the box to remove
+
+    Yields:
+        Box: at most two boxes for each dimension
+    """
+    remaining = list(box)
+    for axis, ((start, stop), (cut_start, cut_stop)) in enumerate(zip(box, other)):
+        if cut_start > start:
+            yield (*remaining[:axis], (start, cut_start), *remaining[axis + 1 :])
+        if cut_stop < stop:
+            yield (*remaining[:axis], (cut_stop, stop), *remaining[axis + 1 :])
+        remaining[axis] = (max(start, cut_start), min(stop, cut_stop))
+
+
+def _box_intersection(box: Box, other: Box) -> Box | None:
+    """Intersect two boxes.
+
+    Args:
+        box (Box): the box
+        other (Box): the other box
+
+    Returns:
+        Box | None: the intersection, or None if the boxes don't overlap
+    """
+    found = tuple(
+        (max(start, other_start), min(stop, other_stop))
+        for (start, stop), (other_start, other_stop) in zip(box, other)
+    )
+    return found if all(start < stop for start, stop in found) else None
+
+
+class BoxSet:
+    """An immutable set of points in N dimensions, held as disjoint boxes.
+
+    Set operations split boxes where they overlap, so each costs O(n * m)
+    box comparisons, rather than visiting every point.
+    """
+
+    __slots__ = ("_boxes",)
+
+    def __init__(self, boxes: Iterable[Box] = ()) -> None:
+        """Initializer.
+
+        Args:
+            boxes (Iterable[Box]): the boxes, which may overlap
+        """
+        self._boxes: list[Box] = []
+        for box in boxes:
+            if all(start < stop for start, stop in box):
+                self._boxes += BoxSet._outside(box, self._boxes)
+
+    @staticmethod
+    def _outside(box: Box, boxes: list[Box]) -> list[Box]:
+        """Split a box into the disjoint boxes outside every one of the boxes.
+
+        Args:
+            box (Box): the box
+            boxes (list[Box]): the boxes to remove
+
+        Returns:
+            list[Box]: the remaining parts of the box
+        """
+        pieces = [box]
+        for other in boxes:
+            pieces = [
+                part
+                for piece in pieces
+                for part in (
+                    _box_difference(piece, other)
+                    if _box_intersection(piece, other)
+                    else (piece,)
+                )
+            ]
+            if not pieces:
+                break
+        return pieces
+
+    def __contains__(self, point: object) -> bool:
+        """Test if a point is in the set, in O(n).
+
+        Args:
+            point (object): the point, as a tuple of integers
+
+        Returns:
+            bool: True if the point is in the set
+        """
+        if not isinstance(point, tuple):
+            return False
+        return any(
+            all(start <= x < stop for x, (start, stop) in zip(point, box))
+            for box in self._boxes
+        )
+
+    def __iter__(self) -> Iterator[Box]:
+        """Iterate over the disjoint boxes.
+
+        Returns:
+            Iterator[Box]: the boxes
+        """
+        return iter(self._boxes)
+
+    def __len__(self) -> int:
+        """The number of disjoint boxes.
+
+        Returns:
+            int: the number of boxes
+        """
+        return len(self._boxes)
+
+    def __repr__(self) -> str:
+        """Represent the set.
+
+        Returns:
+            str: the representation
+        """
+        return f"BoxSet({self._boxes})"
+
+    @property
+    def volume(self) -> int:
+        """The number of points in the set.
+
+        Returns:
+            int: the volume
+        """
+        return sum(prod(stop - start for start, stop in box) for box in self._boxes)
+
+    def __or__(self, other: "BoxSet") -> "BoxSet":
+        """The union of two sets.
+
+        The boxes of the smaller set are kept whole, and the boxes of the
+        larger set are split around them, which fragments the set least when
+        adding a few boxes at a time.
+
+        Args:
+            other (BoxSet): the other set
+
+        Returns:
+            BoxSet: the union
+        """
+        smaller, larger = sorted((self, other), key=len)
+        result = BoxSet()
+        result._boxes = (larger - smaller)._boxes + smaller._boxes
+        return result
+
+    def __and__(self, other: "BoxSet") -> "BoxSet":
+        """The intersection of two sets.
+
+        Args:
+            other (BoxSet): the other set
+
+        Returns:
+            BoxSet: the intersection
+        """
+        others = other._boxes
+        result = BoxSet()
+        result._boxes = [
+            found
+            for box in self._boxes
+            for other_box in others
+            if (found := _box_intersection(box, other_box))
+        ]
+        return result
+
+    def __sub__(self, other: "BoxSet") -> "BoxSet":
+        """The difference of two sets.
+
+        Args:
+            other (BoxSet): the other set
+
+        Returns:
+            BoxSet: the points in this set, but not the other
+        """
+        others = other._boxes
+        result = BoxSet()
+        result._boxes = [
+            piece for box in self._boxes for piece in BoxSet._outside(box, others)
+        ]
+        return result
@@ -0,0 +1,77 @@
+"""Structured results, reported by solutions to advent run."""
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, dataclass
+from json import dumps, loads
+from os import environ, write
+from sys import platform
+from time import perf_counter
+
+from advent.lib.part import PART_ONE, Part
+
+try:
+    from resource import RUSAGE_SELF, getrusage
+except ImportError:  # pragma: no cover
+    getrusage = None  # type: ignore[assignment]
+
+# environment variable holding the file descriptor for the results
+RESULT_FD = "ADVENT_RESULT_FD"
+
+_last = perf_counter()
+
+
+@dataclass
+class Result:
+    """A result reported by a solution."""
+
+    part: int
+    answer: str
+    # seconds since the previous result, or since advent was imported
+    elapsed: float
+    # peak resident memory of the solution in bytes, if known
+    peak_memory: int | None
+
+
+def _peak_memory() -> int | None:
+    """Find the peak resident memory of this process.
+
+    Returns:
+        int | None: the peak memory in bytes, or None if unavailable
+    """
+    if getrusage is None:  # pragma: no cover
+        return None
+    peak = getrusage(RUSAGE_SELF).ru_maxrss
+    return peak if platform == "darwin" else peak * 1024
+
+
+def report(part: Part, answer: int | str) -> None:
+    """Report an answer, with the time taken and peak memory used.
+
+    When run by advent run, the result is sent over a dedicated file
+    descriptor, otherwise it is printed.
+
+    Args:
+        part (Part): part one or part two
+        answer (int | str): the answer
+    """
+    global _last
+    now = perf_counter()
+    result = Result(part.value, str(answer), now - _last, _peak_memory())
+    _last = now
+
+    if RESULT_FD in environ:
+        write(int(environ[RESULT_FD]), (dumps(asdict(result)) + "\n").encode())
+    else:
+        print(f"Part {'One' if part == PART_ONE else 'Two'}: {answer}")  # noqa: T201
+
+
+def parse_results(lines: Iterable[bytes]) -> Iterator[Result]:
+    """Parse the results sent over the result file descriptor.
+
+    Args:
+        lines (Iterable[bytes]): the lines read from the file descriptor
+
+    Yields:
+        Result: the results
+    """
+    for line in lines:
+        yield Result(**loads(line))
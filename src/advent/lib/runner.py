@@ -0,0 +1,413 @@
+"""Run solutions, collecting their reported results."""
+from ast import Import, ImportFrom, parse, walk
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from hashlib import sha256
+from json import dumps, loads
+from os import close, environ, fdopen, pipe, read
+from os import waitstatus_to_exitcode as exit_code
+from pathlib import Path
+from subprocess import PIPE, STDOUT, Popen
+from sys import executable, platform, stdout, version
+from tempfile import TemporaryDirectory
+from threading import Thread, Timer
+from time import perf_counter
+from typing import Any
+
+from advent.lib.config import settings
+from advent.lib.puzzle import Example, get_puzzle, input_variable
+from advent.lib.report import RESULT_FD, Result, parse_results
+
+try:
+    from os import sched_setaffinity
+except ImportError:  # pragma: no cover
+    sched_setaffinity = None  # type: ignore[assignment]
+
+try:
+    from os import killpg, wait4
+    from resource import RLIMIT_AS, setrlimit
+    from signal import SIGKILL
+except ImportError:  # pragma: no cover
+    killpg = wait4 = setrlimit = None  # type: ignore[assignment]
+
+try:
+    from resource import prlimit
+except ImportError:  # pragma: no cover
+    prlimit = None  # type: ignore[assignment]
+
+# size of the chunks of output relayed from the solution
+_CHUNK = 64 * 1024
+
+# the most relayed output kept in the run history, to replay unchanged runs
+_RECORDED_OUTPUT = 64 * 1024
+
+
+@dataclass
+class Usage:
+    """Resources used by a solution, from wait4."""
+
+    user_time: float
+    system_time: float
+    # peak resident memory in bytes
+    peak_memory: int
+    voluntary_switches: int
+    involuntary_switches: int
+
+
+@dataclass
+class Limits:
+    """Resource limits for a solution."""
+
+    # wall clock timeout in seconds
+    timeout: float | None = None
+    # address space limit in bytes
+    max_memory: int | None = None
+    # the CPUs the solution may run on, where CPU affinity is supported
+    cpus: set[int] | None = None
+
+    def apply(self) -> None:
+        """Apply the memory limit to the current process, where prlimit is missing."""
+        if self.max_memory is not None and setrlimit is not None:
+            setrlimit(RLIMIT_AS, (self.max_memory, self.max_memory))
+
+
+@dataclass
+class Run:
+    """The outcome of running a solution."""
+
+    returncode: int
+    results: list[Result] = field(default_factory=list)
+    usage: Usage | None = None
+    timed_out: bool = False
+    # the output, if captured, or else up to the first 64 KiB relayed
+    output: bytes = b""
+    # True if the relayed output was too long to keep
+    truncated: bool = False
+    # when the run was recorded, if it was read from the run history
+    recorded: str | None = None
+    # wall clock time in seconds
+    wall_time: float = 0.0
+
+
+def _wait(process: Popen[bytes]) -> tuple[int, Usage | None]:
+    """Wait for a solution, collecting the resource usage where supported.
+
+    Args:
+        process (Popen[bytes]): the solution's process
+
+    Returns:
+        tuple[int, Usage | None]: the return code and resource usage
+    """
+    if wait4 is None:  # pragma: no cover
+        return process.wait(), None
+    _, status, usage = wait4(process.pid, 0)
+    process.returncode = exit_code(status)
+    return process.returncode, Usage(
+        user_time=usage.ru_utime,
+        system_time=usage.ru_stime,
+        peak_memory=usage.ru_maxrss * (1 if platform == "darwin" else 1024),
+        voluntary_switches=usage.ru_nvcsw,
+        involuntary_switches=usage.ru_nivcsw,
+    )
+
+
+def _relay(fd: int, run: Run, capture: bool) -> None:
+    """Relay the output of a solution in chunks, keeping it for the run history.
+
+    Args:
+        fd (int): the file descriptor of the output pipe
+        run (Run): the run, which keeps the output
+        capture (bool): if True, capture the output rather than relaying it
+    """
+    while chunk := read(fd, _CHUNK):
+        if capture:
+            run.output += chunk
+            continue
+        stdout.buffer.write(chunk)
+        stdout.buffer.flush()
+        if len(run.output) + len(chunk) > _RECORDED_OUTPUT:
+            run.truncated = True
+        elif not run.truncated:
+            run.output += chunk
+
+
+def run_solution(
+    path: str,
+    env: dict[str, str] | None = None,
+    limits: Limits | None = None,
+    capture: bool = False,
+) -> Run:
+    """Run a solution, relaying its output and collecting its results.
+
+    The solution's output is relayed in chunks, while results reported with
+    advent.report are read from a separate pipe, passed to the solution in
+    the ADVENT_RESULT_FD environment variable. The solution is started in
+    a new session, so a timeout also kills any processes it started.
+
+    Args:
+        path (str): the path to the solution
+        env (dict[str, str] | None): extra environment variables
+        limits (Limits | None): the resource limits
+        capture (bool): if True, capture the output rather than relaying it
+
+    Returns:
+        Run: the return code, results and resource usage
+    """
+    limits = limits or Limits()
+    memory = limits.max_memory
+    start = perf_counter()
+    read_fd, write_fd = pipe()
+    process = Popen(
+        [executable, path],  # noqa: S603
+        stdout=PIPE,
+        stderr=STDOUT,
+        env={**environ, **(env or {}), RESULT_FD: str(write_fd)},
+        pass_fds=(write_fd,),
+        start_new_session=True,
+        # preexec_fn isn't safe with threads running, so is only used if the
+        # limit can't be set from here
+        preexec_fn=limits.apply if memory is not None and prlimit is None else None,
+    )
+    close(write_fd)
+    if memory is not None and prlimit is not None:
+        with suppress(ProcessLookupError):
+            prlimit(process.pid, RLIMIT_AS, (memory, memory))
+    if limits.cpus is not None and sched_setaffinity is not None:
+        sched_setaffinity(process.pid, limits.cpus)
+
+    # kill the solution if it runs for too long
+    run = Run(returncode=0)
+    timer = None
+    if limits.timeout is not None:
+
+        def timeout() -> None:
+            run.timed_out = True
+            # kill the whole session, as any processes started by the
+            # solution hold the output pipe open
+            if killpg is None:  # pragma: no cover
+                process.kill()
+            else:
+                with suppress(ProcessLookupError):
+                    killpg(process.pid, SIGKILL)
+
+        timer = Timer(limits.timeout, timeout)
+        timer.start()
+
+    # collect the results in the background
+    with fdopen(read_fd, "rb") as results:
+        reader = Thread(target=lambda: run.results.extend(parse_results(results)))
+        reader.start()
+
+        # relay the output in chunks
+        stdout.flush()
+        if process.stdout is not None:
+            with process.stdout:
+                _relay(process.stdout.fileno(), run, capture)
+
+        # wait for the solution, collecting the resource usage
+        run.returncode, run.usage = _wait(process)
+        run.wall_time = perf_counter() - start
+        if timer is not None:
+            timer.cancel()
+        reader.join()
+
+    return run
+
+
+def run_examples(
+    path: str,
+    year: int,
+    day: int,
+    examples: list[Example],
+    env: dict[str, str] | None = None,
+    limits: Limits | None = None,
+) -> list[tuple[Example, Run]]:
+    """Run a solution on each of the examples in parallel.
+
+    The example input is passed to the solution in the puzzle's input
+    environment variable, which load_puzzle uses in place of the real input.
+    The examples run from threads, so the memory limit is only applied where
+    it can be set with prlimit, rather than in the forked process.
+
+    Args:
+        path (str): the path to the solution
+        year (int): the year
+        day (int): the day
+        examples (list[Example]): the examples
+        env (dict[str, str] | None): extra environment variables
+        limits (Limits | None): the resource limits
+
+    Returns:
+        list[tuple[Example, Run]]: each example, with its captured run
+    """
+    if limits is not None and prlimit is None:  # pragma: no cover
+        limits = replace(limits, max_memory=None)
+
+    with TemporaryDirectory() as directory:
+
+        def run_example(index: int, example: Example) -> tuple[Example, Run]:
+            input_path = Path(directory) / f"example-{index}.txt"
+            with input_path.open("w") as file:
+                file.write(example.input)
+            example_env = {**(env or {}), input_variable(year, day): str(input_path)}
+            return example, run_solution(path, example_env, limits, capture=True)
+
+        with ThreadPoolExecutor() as executor:
+            return list(executor.map(run_example, range(len(examples)), examples))
+
+
+def _module_files(bases: list[Path], name: str) -> Iterator[Path]:
+    """Find the source files of a module and its packages.
+
+    Args:
+        bases (list[Path]): the folders to look for the module in
+        name (str): the dotted module name
+
+    Yields:
+        Path: the source files found
+    """
+    for base in bases:
+        folder = base
+        for part in name.split("."):
+            for candidate in (folder / f"{part}.py", folder / part / "__init__.py"):
+                if candidate.is_file():
+                    yield candidate
+            folder = folder / part
+
+
+def _local_modules(path: Path, roots: list[Path]) -> Iterator[Path]:
+    """Find the source files of the modules imported by a file, from the roots.
+
+    Args:
+        path (Path): the source file
+        roots (list[Path]): the folders to look for modules in
+
+    Yields:
+        Path: the source files of the imported local modules
+    """
+    try:
+        with path.open("rb") as file:
+            nodes = list(walk(parse(file.read(), str(path))))
+    except (OSError, SyntaxError):
+        nodes = []
+    for node in nodes:
+        if isinstance(node, Import):
+            for alias in node.names:
+                yield from _module_files(roots, alias.name)
+        elif isinstance(node, ImportFrom):
+            # relative imports are found from the importing file's package
+            bases = [path.parents[node.level - 1]] if node.level > 0 else roots
+            module = node.module or ""
+            if module:
+                yield from _module_files(bases, module)
+            for alias in node.names:
+                yield from _module_files(bases, f"{module}.{alias.name}".strip("."))
+
+
+def solution_key(path: str, year: int, day: int, input_path: Path | None = None) -> str:
+    """Hash everything a solution's answers depend on.
+
+    The key covers the solution, the local modules it imports (directly or
+    indirectly, from the solution's folder or the current folder), the puzzle
+    input and the Python version.
+
+    Args:
+        path (str): the path to the solution
+        year (int): the year
+        day (int): the day
+        input_path (Path | None): the file replacing the puzzle input, if any
+
+    Returns:
+        str: the hex digest
+    """
+    solution = Path(path).resolve()
+    roots = [solution.parent, Path.cwd()]
+    found = {solution}
+    pending = [solution]
+    while pending:
+        for module in _local_modules(pending.pop(), roots):
+            if module.resolve() not in found:
+                found.add(module.resolve())
+                pending.append(module.resolve())
+
+    digest = sha256(version.encode())
+    for source in sorted(found):
+        with source.open("rb") as file:
+            digest.update(str(source).encode() + b"\0" + file.read() + b"\0")
+    for chunk in get_puzzle(year, day, input_path).input_chunks():
+        digest.update(chunk.encode())
+    return digest.hexdigest()
+
+
+def find_run(year: int, day: int, key: str) -> Run | None:
+    """Find the latest successful run with the same key in the run history.
+
+    Only runs with their whole output recorded are used, so the output can
+    be replayed, as solutions may print their answers rather than report them.
+
+    Args:
+        year (int): the year
+        day (int): the day
+        key (str): the solution key
+
+    Returns:
+        Run | None: the recorded run, or None if not found
+    """
+    path = settings.tool_path / f"runs/{year}/{day:02}.jsonl"
+    if not path.exists():
+        return None
+    with path.open() as file:
+        records = [loads(line) for line in file]
+    for record in reversed(records):
+        if (
+            record.get("key") == key
+            and record["returncode"] == 0
+            and not record["timed_out"]
+            and record.get("output") is not None
+        ):
+            return Run(
+                returncode=0,
+                results=[Result(**result) for result in record["results"]],
+                output=record["output"].encode(errors="surrogateescape"),
+                usage=Usage(**record["usage"]) if record["usage"] else None,
+                recorded=record["time"],
+                wall_time=record.get("wall_time", 0.0),
+            )
+    return None
+
+
+def record_run(
+    year: int,
+    day: int,
+    run: Run,
+    limits: Limits | None = None,
+    key: str | None = None,
+) -> None:
+    """Append a run to the run history for the puzzle.
+
+    Args:
+        year (int): the year
+        day (int): the day
+        run (Run): the run
+        limits (Limits | None): the resource limits the run used
+        key (str | None): the solution key, used to skip unchanged runs
+    """
+    record: dict[str, Any] = {
+        "time": datetime.now(tz=timezone.utc).isoformat(),
+        **asdict(run),
+        "limits": asdict(limits or Limits()),
+        "key": key,
+    }
+    record["output"] = (
+        None if run.truncated else run.output.decode(errors="surrogateescape")
+    )
+    del record["recorded"], record["truncated"]
+    if record["limits"]["cpus"] is not None:
+        record["limits"]["cpus"] = sorted(record["limits"]["cpus"])
+    path = settings.tool_path / f"runs/{year}/{day:02}.jsonl"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as file:
+        file.write(dumps(record) + "\n")
@@ -0,0 +1,149 @@
+"""Full text search over the cached puzzle descriptions, using SQLite FTS5."""
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from logging import getLogger
+from sqlite3 import Connection, connect
+
+from advent.lib.config import settings
+from advent.lib.parse import page_descriptions, page_title, parse_html
+
+log = getLogger(__name__)
+
+_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS descriptions USING fts5(
+    title,
+    body,
+    user UNINDEXED,
+    year UNINDEXED,
+    day UNINDEXED,
+    part UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS pages (
+    user TEXT,
+    year INTEGER,
+    day INTEGER,
+    modified REAL,
+    PRIMARY KEY (user, year, day)
+);
+"""
+
+
+@dataclass(frozen=True)
+class Hit:
+    """A puzzle description matching a search."""
+
+    year: int
+    day: int
+    part: int
+    title: str
+    # the matching text, with the terms in [brackets]
+    snippet: str
+    # the BM25 rank, where lower is better
+    rank: float
+
+
+@contextmanager
+def _database() -> Iterator[Connection]:
+    """Open the search index, next to the cache it indexes.
+
+    Yields:
+        Connection: the connection, committed on exit
+    """
+    settings.cache_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = connect(settings.cache_path.parent / "search.sqlite", timeout=60)
+    try:
+        connection.executescript(_SCHEMA)
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
+def index_page(
+    year: int, day: int, html: str, modified: float, user: str = "default"
+) -> None:
+    """Add a puzzle page to the index, replacing any earlier version.
+
+    Args:
+        year (int): the year
+        day (int): the day
+        html (str): the puzzle page
+        modified (float): the modification time of the cached page
+        user (str): the user
+    """
+    soup = parse_html(html)
+    try:
+        title = page_title(soup)
+    except StopIteration:
+        log.warning(f"No puzzle found to index in {year} day {day}")
+        return
+    with _database() as database:
+        database.execute(
+            "DELETE FROM descriptions WHERE user = ? AND year = ? AND day = ?",
+            (user, year, day),
+        )
+        database.executemany(
+            "INSERT INTO descriptions (title, body, user, year, day, part) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (title, body, user, year, day, part)
+                for part, body in enumerate(page_descriptions(soup), start=1)
+            ],
+        )
+        database.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+            (user, year, day, modified),
+        )
+
+
+def indexed_pages(user: str = "default") -> dict[tuple[int, int], float]:
+    """List the pages in the index.
+
+    Args:
+        user (str): the user
+
+    Returns:
+        dict[tuple[int, int], float]: the modification time of each indexed
+            page, by year and day
+    """
+    with _database() as database:
+        return {
+            (year, day): modified
+            for year, day, modified in database.execute(
+                "SELECT year, day, modified FROM pages WHERE user = ?", (user,)
+            )
+        }
+
+
+def search(terms: str, user: str = "default", limit: int = 10) -> list[Hit]:
+    """Search the puzzle descriptions, ranking matches in the title higher.
+
+    Every term must match, and terms are matched by their stem, so "rotate"
+    also finds "rotating".
+
+    Args:
+        terms (str): the search terms
+        user (str): the user
+        limit (int): the maximum number of hits
+
+    Returns:
+        list[Hit]: the hits, best first
+    """
+    # quote each term, so punctuation isn't read as query syntax
+    query = " ".join('"' + term.replace('"', '""') + '"' for term in terms.split())
+    if not query:
+        return []
+    with _database() as database:
+        return [
+            Hit(*row)
+            for row in database.execute(
+                "SELECT year, day, part, title, "
+                "snippet(descriptions, 1, '[', ']', '...', 12), "
+                "bm25(descriptions, 5.0, 1.0) AS rank "
+                "FROM descriptions WHERE descriptions MATCH ? AND user = ? "
+                "ORDER BY rank LIMIT ?",
+                (query, user, limit),
+            )
+        ]
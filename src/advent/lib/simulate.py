@@ -0,0 +1,104 @@
+"""Cycle detecting simulation runner."""
+from collections.abc import Callable
+from dataclasses import dataclass
+from hashlib import blake2b
+from pickle import dumps
+from typing import Generic, TypeVar
+
+S = TypeVar("S")
+
+
+@dataclass(frozen=True)
+class Simulation(Generic[S]):
+    """The result of a simulation."""
+
+    # the state after the requested number of iterations
+    state: S
+    # the number of times the step function was called
+    steps: int
+    # the length of the cycle, or None if no cycle was found
+    cycle_length: int | None
+
+
+def fingerprint(state: object) -> int:
+    """Fingerprint a state.
+
+    Hashable states use the builtin hash. Anything else (lists, dicts,
+    NumPy arrays, etc) is pickled and hashed with a 64 bit BLAKE2 digest.
+
+    Args:
+        state (object): the state
+
+    Returns:
+        int: the fingerprint
+    """
+    try:
+        return hash(state)
+    except TypeError:
+        return int.from_bytes(blake2b(dumps(state), digest_size=8).digest(), "big")
+
+
+def _equal(a: object, b: object) -> bool:
+    """Compare two states, reducing array comparisons to a single result.
+
+    Args:
+        a (object): the first state
+        b (object): the second state
+
+    Returns:
+        bool: True if the states are equal
+    """
+    if hasattr(a, "__array__"):
+        from numpy import array_equal
+
+        return bool(array_equal(a, b))  # type: ignore[arg-type]
+    return bool(a == b)
+
+
+def simulate(
+    step: Callable[[S], S],
+    state: S,
+    iterations: int,
+    key: Callable[[S], int] = fingerprint,
+    verify: bool = False,
+) -> Simulation[S]:
+    """Run a simulation, skipping ahead once the states start to repeat.
+
+    Cycles are found using Brent's algorithm, so only two states and their
+    fingerprints are held in memory at any time. The step function must
+    return a new state, rather than modify the state passed to it.
+
+    Args:
+        step (Callable[[S], S]): function returning the next state
+        state (S): the initial state
+        iterations (int): the number of iterations to run
+        key (Callable[[S], int]): function to fingerprint a state
+        verify (bool): if True, states with matching fingerprints are
+            also compared for equality, to guard against hash collisions
+
+    Returns:
+        Simulation[S]: the final state, with the cycle details
+    """
+    # search for a cycle, with the tortoise teleporting to the hare
+    # each time the search length reaches the next power of two
+    tortoise, tortoise_key = state, key(state)
+    hare = state
+    power, length, index = 1, 0, 0
+    while index < iterations:
+        hare = step(hare)
+        index += 1
+        hare_key = key(hare)
+        length += 1
+        if hare_key == tortoise_key and (not verify or _equal(hare, tortoise)):
+            break
+        if length == power:
+            tortoise, tortoise_key = hare, hare_key
+            power *= 2
+            length = 0
+    else:
+        return Simulation(hare, index, None)
+
+    # the hare is inside the cycle, so skip the remaining whole cycles
+    for _ in range((iterations - index) % length):
+        hare = step(hare)
+    return Simulation(hare, index + (iterations - index) % length, length)
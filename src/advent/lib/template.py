@@ -59,7 +59,7 @@ _default = '''"""Solve the puzzle Advent of Code for day {day} of the {year} eve
 
 {url}
 """
-from advent import load_puzzle
+from advent import PART_ONE, PART_TWO, load_puzzle, report
 
 
 def solve() -> None:
@@ -70,11 +70,11 @@ def solve() -> None:
 
     # solve part one
     ...
-    print(-1)
+    report(PART_ONE, -1)
 
     # solve part two
     ...
-    print(-1)
+    report(PART_TWO, -1)
 
 if __name__ == "__main__":  # pragma: no cover
     solve()
@@ -0,0 +1,80 @@
+"""Shared fixtures, keeping the tool's files in temporary folders."""
+from atexit import register
+from collections.abc import Iterator
+from os import environ
+from pathlib import Path
+from shutil import rmtree
+from sys import path
+from tempfile import mkdtemp
+
+import pytest
+
+# keep the machine-wide store out of the home folder, before the settings
+# are read on import
+environ["XDG_CACHE_HOME"] = mkdtemp()
+environ.setdefault("AOC_SESSION", "test")
+register(rmtree, environ["XDG_CACHE_HOME"], ignore_errors=True)
+
+# the local stand-in for the website is shared with the benchmarks
+path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+from advent.lib.config import settings  # noqa: E402
+from advent.lib.puzzle import get_puzzle  # noqa: E402
+from server import FakeServer  # noqa: E402
+
+# the metrics are saved on exit, after the temporary folders are removed
+settings.metrics_enabled = False
+
+
+@pytest.fixture()
+def cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Use an empty project and machine-wide store in a temporary folder.
+
+    The settings are also saved to the project's config file, for solutions
+    run in a subprocess.
+
+    Args:
+        tmp_path (Path): the temporary folder
+        monkeypatch (pytest.MonkeyPatch): the monkeypatch fixture
+
+    Returns:
+        Path: the shared cache folder
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "tool_path", tmp_path / ".advent-tool")
+    monkeypatch.setattr(settings, "shared_path", tmp_path / "shared")
+    monkeypatch.setattr(settings, "cache_path", tmp_path / "shared/cache")
+    get_puzzle.cache_clear()
+    with Path(".advent-tool.toml").open("w") as file:
+        file.write(f'[cache]\npath = "{settings.shared_path.as_posix()}"\n')
+        file.write("\n[metrics]\nenabled = false\n")
+    return settings.cache_path
+
+
+@pytest.fixture()
+def server(
+    cache: Path, monkeypatch: pytest.MonkeyPatch  # noqa: ARG001
+) -> Iterator[FakeServer]:
+    """Serve the stand-in website, without the rate limit, into an empty cache.
+
+    Args:
+        cache (Path): the cache fixture, so downloads are kept apart
+        monkeypatch (pytest.MonkeyPatch): the monkeypatch fixture
+
+    Yields:
+        FakeServer: the running server
+    """
+    from pyrate_limiter.abstracts.rate import Duration, Rate
+    from pyrate_limiter.buckets.in_memory_bucket import InMemoryBucket
+    from pyrate_limiter.limiter import Limiter
+
+    import advent.lib.http
+
+    bucket = InMemoryBucket([Rate(10**9, Duration.SECOND)])
+    monkeypatch.setattr(advent.lib.http, "_bucket", bucket)
+    monkeypatch.setattr(advent.lib.http, "limiter", Limiter(bucket))
+    with FakeServer() as fake:
+        monkeypatch.setattr(settings, "http_root", fake.root)
+        with Path(".advent-tool.toml").open("a") as file:
+            file.write(f'\n[http]\nroot = "{fake.root}"\n')
+        yield fake
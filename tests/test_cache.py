@@ -0,0 +1,48 @@
+"""Tests for the download cache, shared by every project."""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from advent.lib.cache import find_cached, get_puzzle_input
+from advent.lib.config import settings
+from advent.lib.maintenance import collect_garbage, disk_usage
+from server import FakeServer, puzzle_input
+
+
+def test_concurrent_downloads(server: FakeServer, cache: Path) -> None:
+    """Processes or threads fetching the same file download it once."""
+    with ThreadPoolExecutor(6) as executor:
+        inputs = list(executor.map(lambda _: get_puzzle_input(2016, 3), range(6)))
+    assert inputs == [puzzle_input(2016, 3)] * 6
+    assert server.server.requests.count("/2016/day/3/input") == 1
+    assert (cache / "default/2016/03/input.txt").exists()
+
+
+@pytest.mark.usefixtures("server")
+def test_no_lock_files_in_the_cache(cache: Path) -> None:
+    """The lock files are kept apart, so aren't counted as cached files."""
+    get_puzzle_input(2016, 3)
+    assert not list(cache.rglob("*.lock"))
+    assert list((settings.shared_path / "locks").glob("*.lock"))
+    assert {kind for _, _, kind in disk_usage()} == {"input"}
+
+    # lock files left next to the cached files are removed
+    (cache / "default/2016/03/.input.txt.lock").touch()
+    collect_garbage(budget=10**9)
+    assert not list(cache.rglob("*.lock"))
+
+
+def test_project_overlay(cache: Path) -> None:
+    """Files in the project's cache take precedence over the shared cache."""
+    relative = "default/2016/04/input.txt"
+    (cache / relative).parent.mkdir(parents=True)
+    (cache / relative).write_text("shared")
+    assert find_cached(relative) == cache / relative
+    assert get_puzzle_input(2016, 4) == "shared"
+
+    project = settings.tool_path / "cache" / relative
+    project.parent.mkdir(parents=True)
+    project.write_text("project")
+    assert find_cached(relative) == project
+    assert get_puzzle_input(2016, 4) == "project"
@@ -0,0 +1,14 @@
+"""Tests for the calendar of collected stars."""
+import pytest
+
+from advent.lib.calendar import Calendar
+from advent.lib.metrics import _labels, parse_seconds
+
+
+@pytest.mark.usefixtures("server")
+def test_stars() -> None:
+    """The stars are read from the calendar, timing the parsing as a page's."""
+    key = _labels({"stage": "soup"})
+    _, _, parsed = parse_seconds.values.get(key, ([], 0.0, 0))
+    assert Calendar(2016).stars == dict.fromkeys(range(1, 26), 2)
+    assert parse_seconds.values[key][2] == parsed + 1
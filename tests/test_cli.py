@@ -0,0 +1,88 @@
+"""Tests for the command line interface."""
+from pathlib import Path
+
+import pytest
+
+import advent.cli
+from advent.cli import _create_argument_parser
+
+_SOLUTION = """\
+from advent import load_puzzle
+puzzle = load_puzzle(2016, 1)
+print("part one:", len(puzzle.input_file.splitlines()))
+"""
+
+
+def _run(*argv: str) -> None:
+    """Run the advent command."""
+    args = _create_argument_parser().parse_args(argv)
+    args.func(args)
+
+
+@pytest.mark.usefixtures("server")
+def test_unchanged_run_replays_output(capfd: pytest.CaptureFixture[str]) -> None:
+    """An unchanged solution replays the printed answers of the last run."""
+    solution = Path("src/2016/01/solution.py")
+    solution.parent.mkdir(parents=True)
+    solution.write_text(_SOLUTION)
+
+    _run("run", "2016", "1")
+    assert "Executing" in capfd.readouterr().out
+
+    _run("run", "2016", "1")
+    replayed = capfd.readouterr().out
+    assert "Unchanged since" in replayed
+    assert "part one: 2000\n" in replayed
+
+
+@pytest.mark.usefixtures("server")
+def test_unchanged_run_skips_examples(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The examples are only run if the solution has changed."""
+    solution = Path("src/2016/01/solution.py")
+    solution.parent.mkdir(parents=True)
+    solution.write_text(_SOLUTION)
+    _run("run", "2016", "1")
+
+    checked = []
+
+    def check_examples(*args: object) -> bool:
+        checked.append(args)
+        return True
+
+    monkeypatch.setattr(advent.cli, "_check_examples", check_examples)
+    _run("run", "2016", "1", "--examples")
+    assert not checked
+
+    solution.write_text(_SOLUTION + "# changed\n")
+    _run("run", "2016", "1", "--examples")
+    assert checked
+
+
+@pytest.mark.usefixtures("server")
+def test_alternate_input_is_not_submitted(
+    tmp_path: Path, capfd: pytest.CaptureFixture[str]
+) -> None:
+    """Answers for a replaced input are never submitted."""
+    solution = Path("src/2016/01/solution.py")
+    solution.parent.mkdir(parents=True)
+    solution.write_text(_SOLUTION)
+    large = tmp_path / "large.txt"
+    large.write_text("1\n" * 1_000_000)
+
+    _run("run", "2016", "1", "--input", str(large), "--submit")
+    output = capfd.readouterr().out
+    assert "Input 1.9 MB in" in output
+    assert f"Not submitting answers for {large}" in output
+
+
+@pytest.mark.usefixtures("cache")
+def test_run_missing_files(capfd: pytest.CaptureFixture[str]) -> None:
+    """A missing solution or input is reported, rather than raising."""
+    _run("run", "2016", "5")
+    assert "No solution at src/2016/05/solution.py" in capfd.readouterr().out
+
+    solution = Path("src/2016/05/solution.py")
+    solution.parent.mkdir(parents=True)
+    solution.write_text(_SOLUTION)
+    _run("run", "2016", "5", "--input", "missing.txt")
+    assert "No input at" in capfd.readouterr().out
@@ -0,0 +1,86 @@
+"""Tests for the private leaderboard."""
+from typing import Any
+
+import pytest
+
+import advent.lib.leaderboard
+from advent.lib.config import settings
+from advent.lib.leaderboard import _diff, get_leaderboard
+from server import FakeServer
+
+_PATH = "/2016/leaderboard/private/view/1234.json"
+
+
+def _later(monkeypatch: pytest.MonkeyPatch, seconds: float) -> None:
+    """Move the clock on, as seen by the leaderboard."""
+    now = vars(advent.lib.leaderboard)["time"]() + seconds
+    monkeypatch.setattr(advent.lib.leaderboard, "time", lambda: now)
+
+
+def test_refresh_interval(server: FakeServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The leaderboard is only downloaded again once the refresh time has passed."""
+    snapshot, _ = get_leaderboard(1234, 2016)
+    assert len(snapshot["members"]) == 200
+
+    _later(monkeypatch, settings.leaderboard_refresh - 60)
+    assert get_leaderboard(1234, 2016)[0] == snapshot
+    assert server.server.requests.count(_PATH) == 1
+
+    _later(monkeypatch, 120)
+    get_leaderboard(1234, 2016)
+    assert server.server.requests.count(_PATH) == 2
+
+
+def test_not_modified(server: FakeServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A 304 response keeps the snapshot, without a new delta."""
+    snapshot, delta = get_leaderboard(1234, 2016)
+    history = settings.cache_path / "default/leaderboard/1234/2016/history.jsonl"
+
+    _later(monkeypatch, settings.leaderboard_refresh + 1)
+    refreshed, refreshed_delta = get_leaderboard(1234, 2016)
+    assert server.server.requests.count(_PATH) == 2
+    assert refreshed["members"] == snapshot["members"]
+    assert refreshed["fetched"] > snapshot["fetched"]
+    assert refreshed_delta == delta
+    assert len(history.read_text().splitlines()) == 1
+
+
+def test_delta(server: FakeServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Changes to the leaderboard are found for each member, and kept."""
+    server.server.days = 24
+    get_leaderboard(1234, 2016)
+
+    server.server.days = 25
+    server.server.members = 201
+    _later(monkeypatch, settings.leaderboard_refresh + 1)
+    snapshot, delta = get_leaderboard(1234, 2016)
+    assert delta is not None
+    assert len(delta["members"]) == 201
+    assert delta["members"]["7"] == {
+        "name": "member 7",
+        "score": 1,
+        "stars": 2,
+        "new": [[25, 1, 1_700_000_000], [25, 2, 1_700_000_000]],
+    }
+    assert delta["members"]["200"]["stars"] == 50
+    assert snapshot["members"]["7"]["stars"] == 50
+
+
+def test_diff_carries_over_unchanged_members() -> None:
+    """Members with the same score and last star aren't compacted again."""
+    previous = {"1": {"score": 10, "last_star_ts": 5, "stars": 2, "days": {}}}
+    member: dict[str, Any] = {
+        "id": 1,
+        "name": None,
+        "local_score": 10,
+        "stars": 2,
+        "last_star_ts": 5,
+        "completion_day_level": {},
+    }
+    compact, changes = _diff(previous, {"1": member})
+    assert compact["1"] is previous["1"]
+    assert changes == {}
+
+    compact, changes = _diff({}, {"1": member})
+    assert compact["1"]["name"] == "(anonymous user #1)"
+    assert changes["1"]["score"] == 10
@@ -0,0 +1,110 @@
+"""Tests for the cache garbage collection and disk usage."""
+from pathlib import Path
+from shutil import rmtree
+
+import pytest
+
+from advent.lib.maintenance import (
+    _diff,
+    _patch,
+    collect_garbage,
+    disk_usage,
+    read_page_history,
+)
+
+
+@pytest.mark.parametrize(
+    ("newer", "older"),
+    [
+        ("", ""),
+        ("a\nb\nc\n", "a\nb\nc\n"),
+        ("a\nb\nc\n", "a\nx\nc\n"),
+        ("a\nb\nc\n", ""),
+        ("", "a\nb\n"),
+        ("a\nb\nc", "b\nc\nd"),
+        ("a\r\nb\r\n", "a\r\nc\r\n"),
+    ],
+)
+def test_patch_rebuilds_older(newer: str, older: str) -> None:
+    """A delta rebuilds the older version from the newer one."""
+    assert _patch(newer, _diff(newer, older)) == older
+
+
+def _version(number: int) -> str:
+    """Create a version of a page, with one changed line."""
+    lines = [f"<p>line {line} of the puzzle</p>\n" for line in range(50)]
+    lines[number * 7] = f"<p>changed in version {number}</p>\n"
+    return "".join(lines)
+
+
+def _save_versions(cache: Path, count: int) -> list[str]:
+    """Save a page with its history, as refreshing it would.
+
+    Args:
+        cache (Path): the cache folder
+        count (int): the number of versions
+
+    Returns:
+        list[str]: the previous versions, newest first
+    """
+    folder = cache / "default/2016/01"
+    (folder / "history").mkdir(parents=True)
+    versions = [_version(number) for number in range(count)]
+    for number, version in enumerate(versions[:-1]):
+        (folder / f"history/{1000 + number}.html").write_text(version)
+    (folder / "index.html").write_text(versions[-1])
+    return versions[-2::-1]
+
+
+def test_compacted_history_is_unchanged(cache: Path) -> None:
+    """Compaction to deltas keeps every previous version."""
+    previous = _save_versions(cache, 5)
+    collection = collect_garbage(budget=10**9)
+    assert collection.compacted_pages == 4
+    assert collection.evicted_pages == 0
+    assert read_page_history(2016, 1) == previous
+
+
+def test_eviction_keeps_the_newest_history(cache: Path) -> None:
+    """Eviction removes the oldest version, which no other delta needs."""
+    previous = _save_versions(cache, 5)
+    size = collect_garbage(budget=10**9).size_after
+
+    # the newest delta is written first, so has the oldest modification time
+    collection = collect_garbage(budget=size - 1)
+    assert collection.evicted_pages == 1
+    assert not (cache / "default/2016/01/history/1000.delta.json").exists()
+    assert read_page_history(2016, 1) == previous[:-1]
+
+
+@pytest.mark.parametrize("evicted", range(5))
+def test_eviction_while_compacting(cache: Path, evicted: int) -> None:
+    """Compaction and eviction in one collection keep the newest versions."""
+    previous = _save_versions(cache, 5)
+    history = cache / "default/2016/01/history"
+    size = collect_garbage(budget=10**9).size_after
+    deltas = sorted(history.iterdir())
+    budget = size - sum(path.stat().st_size for path in deltas[:evicted])
+
+    rmtree(cache)
+    _save_versions(cache, 5)
+    collection = collect_garbage(budget=budget)
+    assert collection.evicted_pages == evicted
+    assert read_page_history(2016, 1) == previous[: 4 - evicted]
+
+
+def test_disk_usage_of_stray_files(cache: Path) -> None:
+    """Files outside the usual layout are counted as other files."""
+    (cache / "default/2016/01").mkdir(parents=True)
+    (cache / ".DS_Store").write_bytes(b"1")
+    (cache / "default/foo").write_bytes(b"22")
+    (cache / "default/2016/index.html").write_bytes(b"333")
+    (cache / "default/2016/notes.txt").write_bytes(b"4444")
+    (cache / "default/2016/01/input.txt").write_bytes(b"55555")
+    assert disk_usage() == {
+        (".DS_Store", "-", "other"): 1,
+        ("default", "-", "other"): 2,
+        ("default", "2016", "calendar"): 3,
+        ("default", "2016", "other"): 4,
+        ("default", "2016", "input"): 5,
+    }
@@ -0,0 +1,78 @@
+"""Tests for the parallel map and reduce."""
+from operator import add
+from pathlib import Path
+
+import pytest
+
+from advent import load_puzzle, pmap, preduce, shared_array, shared_input
+from advent.lib.puzzle import get_puzzle
+
+
+def _line(index: int) -> bytes:
+    """Read a line of the shared input, without decoding it all."""
+    return bytes(shared_input()).split(b"\n")[index]
+
+
+def _puzzle_line(index: int) -> str:
+    """Read a line of the input through the puzzle."""
+    return load_puzzle(2016, 1).input_file.splitlines()[index]
+
+
+def _input_is_view(_: int) -> bool:
+    """Check the shared input is a read only view."""
+    return shared_input().readonly
+
+
+def _row_sum(row: int) -> int:
+    """Sum a row of the shared array."""
+    return int(shared_array("grid")[row].sum())
+
+
+def _title(_: int) -> str:
+    """Read the title of the shared puzzle."""
+    return load_puzzle(2016, 1).title
+
+
+@pytest.mark.usefixtures("server")
+def test_shared_input() -> None:
+    """The workers read the puzzle input from shared memory."""
+    puzzle = load_puzzle(2016, 1)
+    lines = puzzle.input_file.split("\n")
+    assert pmap(_line, range(5), puzzle=puzzle, processes=2) == [
+        line.encode() for line in lines[:5]
+    ]
+    assert pmap(_puzzle_line, [3, 1], puzzle=puzzle, processes=2) == [
+        lines[3],
+        lines[1],
+    ]
+    assert all(pmap(_input_is_view, range(4), puzzle=puzzle, processes=2))
+
+
+@pytest.mark.usefixtures("server")
+def test_page_is_only_shared_if_cached(cache: Path) -> None:
+    """Sharing a puzzle doesn't download the page, which may not be needed."""
+    puzzle = get_puzzle(2016, 2)
+    _ = puzzle.input_file
+    pmap(_line, range(2), puzzle=puzzle, processes=2)
+    assert not (cache / "default/2016/02/index.html").exists()
+
+
+@pytest.mark.usefixtures("server")
+def test_cached_page_is_shared() -> None:
+    """The workers use the page shared by the parent."""
+    puzzle = load_puzzle(2016, 1)
+    assert pmap(_title, range(2), puzzle=puzzle, processes=2) == [puzzle.title] * 2
+
+
+def test_preduce_shared_array() -> None:
+    """The workers read NumPy arrays from shared memory."""
+    numpy = pytest.importorskip("numpy")
+    grid = numpy.arange(100).reshape(10, 10)
+    assert preduce(_row_sum, add, range(10), 0, arrays={"grid": grid}) == 4950
+    assert pmap(_row_sum, [2], arrays={"grid": grid}, processes=1) == [245]
+
+
+def test_no_shared_input() -> None:
+    """Without a shared puzzle, there is no shared input."""
+    with pytest.raises(LookupError):
+        shared_input()
@@ -0,0 +1,32 @@
+"""Tests for reading the puzzle input."""
+from pathlib import Path
+
+import pytest
+
+from advent import load_puzzle
+from server import puzzle_input
+
+
+def test_stream_alternate_input(tmp_path: Path) -> None:
+    """A replaced input is streamed from its file, without reading it all."""
+    path = tmp_path / "large.txt"
+    path.write_text("".join(f"{number}\n" for number in range(100_000)))
+    puzzle = load_puzzle(2016, 5, path)
+
+    assert puzzle.input_size == path.stat().st_size
+    assert sum(int(line) for line in puzzle.input_lines()) == sum(range(100_000))
+    chunks = list(puzzle.input_chunks(4096))
+    assert all(len(chunk) == 4096 for chunk in chunks[:-1])
+    assert "".join(chunks) == path.read_text()
+    assert not hasattr(puzzle, "input_file_cache")
+
+
+@pytest.mark.usefixtures("server")
+def test_stream_cached_input() -> None:
+    """The cached input streams the same as it reads."""
+    puzzle = load_puzzle(2016, 6)
+    expected = puzzle_input(2016, 6)
+    assert list(puzzle.input_lines()) == expected.split("\n")
+    assert "".join(puzzle.input_chunks(1000)) == expected
+    assert puzzle.input_size == len(expected.encode())
+    assert load_puzzle(2016, 6) is puzzle
@@ -0,0 +1,102 @@
+"""Tests for the interval sets, range maps and box sets, against point sets."""
+from itertools import product
+from random import Random
+
+import pytest
+
+from advent.lib.ranges import Box, BoxSet, Interval, IntervalSet, RangeMap
+
+# the points the random intervals are drawn from
+_RANGE = 40
+
+
+def _intervals(random: Random) -> list[Interval]:
+    """Draw some random intervals, which may overlap, touch or be empty."""
+    found = []
+    for _ in range(random.randrange(6)):
+        start = random.randrange(-5, _RANGE)
+        found.append((start, start + random.randrange(-1, 10)))
+    return found
+
+
+def _points(intervals: IntervalSet) -> set[int]:
+    """List the points in an interval set."""
+    return {point for start, stop in intervals for point in range(start, stop)}
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_interval_set(seed: int) -> None:
+    """The set operations match the same operations on the points."""
+    random = Random(seed)
+    a, b = IntervalSet(_intervals(random)), IntervalSet(_intervals(random))
+    points_a, points_b = _points(a), _points(b)
+
+    assert _points(a | b) == points_a | points_b
+    assert _points(a & b) == points_a & points_b
+    assert _points(a - b) == points_a - points_b
+    assert _points(a ^ b) == points_a ^ points_b
+    assert a.size == len(points_a)
+    assert all((x in a) == (x in points_a) for x in range(-10, _RANGE + 10))
+    assert a.overlapping(5, 20) == a & IntervalSet([(5, 20)])
+    assert a.bounds == ((min(points_a), max(points_a) + 1) if points_a else None)
+
+    # the intervals are disjoint and don't touch, so sets are equal by value
+    stops = [stop for _, stop in a]
+    assert all(stop < start for stop, (start, _) in zip(stops, list(a)[1:]))
+    assert IntervalSet(list(a) + list(a)) == a
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_range_map(seed: int) -> None:
+    """The image of a set is the set of the mapped points."""
+    random = Random(seed)
+    pieces = [
+        (start, stop, random.randrange(-50, 50))
+        for start, stop in IntervalSet(_intervals(random))
+    ]
+    mapping = RangeMap(pieces)
+    intervals = IntervalSet(_intervals(random))
+
+    assert _points(mapping.image(intervals)) == {
+        mapping(point) for point in _points(intervals)
+    }
+    for start, stop, offset in pieces:
+        assert mapping(start) == start + offset
+        assert mapping(stop - 1) == stop - 1 + offset
+
+
+def test_range_map_rejects_overlaps() -> None:
+    """Overlapping pieces would make the map ambiguous."""
+    with pytest.raises(ValueError, match="overlap"):
+        RangeMap([(0, 10, 1), (5, 15, 2)])
+
+
+def _box(random: Random) -> Box:
+    """Draw a random box in three dimensions, which may be empty."""
+    return tuple(
+        (start, start + random.randrange(0, 5))
+        for start in (random.randrange(8) for _ in range(3))
+    )
+
+
+def _cells(boxes: BoxSet) -> set[tuple[int, ...]]:
+    """List the points in a box set."""
+    return {cell for box in boxes for cell in product(*(range(*x) for x in box))}
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_box_set(seed: int) -> None:
+    """The set operations match the same operations on the points."""
+    random = Random(seed)
+    a = BoxSet(_box(random) for _ in range(random.randrange(5)))
+    b = BoxSet(_box(random) for _ in range(random.randrange(5)))
+    cells_a, cells_b = _cells(a), _cells(b)
+
+    assert a.volume == len(cells_a)
+    assert _cells(a | b) == cells_a | cells_b
+    assert (a | b).volume == len(cells_a | cells_b)
+    assert _cells(a & b) == cells_a & cells_b
+    assert _cells(a - b) == cells_a - cells_b
+    assert all(
+        (cell in a) == (cell in cells_a) for cell in product(range(12), repeat=3)
+    )
@@ -0,0 +1,71 @@
+"""Tests for running solutions."""
+from pathlib import Path
+from subprocess import Popen
+
+import pytest
+
+import advent.lib.runner
+from advent.lib.part import PART_ONE
+from advent.lib.puzzle import Example
+from advent.lib.runner import Limits, run_examples, run_solution
+
+_REPORTING = """\
+from advent import PART_ONE, report
+print("part one: 6")
+report(PART_ONE, 6)
+"""
+
+_SPAWNING = """\
+from subprocess import Popen
+from sys import executable
+from time import sleep
+Popen([executable, "-c", "from time import sleep; sleep(60)"])
+sleep(60)
+"""
+
+_LIMITED = """\
+from resource import RLIMIT_AS, getrlimit
+print(getrlimit(RLIMIT_AS)[0])
+"""
+
+_EXAMPLE = Example(PART_ONE, "1", "1")
+
+
+def test_results_and_output(tmp_path: Path) -> None:
+    """The output is captured, and the reported results collected."""
+    solution = tmp_path / "solution.py"
+    solution.write_text(_REPORTING)
+    run = run_solution(str(solution), capture=True)
+    assert run.returncode == 0
+    assert run.output == b"part one: 6\n"
+    assert [(result.part, result.answer) for result in run.results] == [(1, "6")]
+    assert run.usage is not None
+
+
+def test_timeout_kills_started_processes(tmp_path: Path) -> None:
+    """A timeout kills the processes started by the solution, which hold the pipe."""
+    solution = tmp_path / "solution.py"
+    solution.write_text(_SPAWNING)
+    run = run_solution(str(solution), limits=Limits(timeout=1), capture=True)
+    assert run.timed_out
+    assert run.wall_time < 30
+
+
+def test_memory_limit(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The memory limit is set from the parent, without forking with a preexec_fn."""
+    preexec_fns = []
+
+    def popen(*args: object, **kwargs: object) -> object:
+        preexec_fns.append(kwargs["preexec_fn"])
+        return Popen(*args, **kwargs)  # type: ignore[call-overload]  # noqa: S603
+
+    monkeypatch.setattr(advent.lib.runner, "Popen", popen)
+    solution = tmp_path / "solution.py"
+    solution.write_text(_LIMITED)
+    limits = Limits(max_memory=512 * 1024 * 1024)
+    assert run_solution(str(solution), limits=limits, capture=True).output == (
+        f"{limits.max_memory}\n".encode()
+    )
+    runs = run_examples(str(solution), 2016, 1, [_EXAMPLE] * 3, limits=limits)
+    assert {run.output for _, run in runs} == {f"{limits.max_memory}\n".encode()}
+    assert preexec_fns == [None] * 4
@@ -0,0 +1,53 @@
+"""Tests for the full text search over the puzzle descriptions."""
+from pathlib import Path
+
+import pytest
+
+from advent.lib.cache import get_puzzle_page, index_cached_pages
+from advent.lib.search import search
+from server import page
+
+
+@pytest.mark.usefixtures("server")
+def test_pages_are_indexed_when_cached() -> None:
+    """Downloaded pages are searchable, by either part, without reindexing."""
+    for day in range(1, 4):
+        get_puzzle_page(2016, day)
+    assert index_cached_pages() == 0
+
+    hits = search("synthetic puzzle 2")
+    assert (hits[0].year, hits[0].day, hits[0].title) == (
+        2016,
+        2,
+        "Synthetic Puzzle 2",
+    )
+    assert {(hit.day, hit.part) for hit in search("synthetic", limit=10)} == {
+        (day, part) for day in range(1, 4) for part in (1, 2)
+    }
+    assert "[Elves]" in search("elves")[0].snippet
+
+
+@pytest.mark.usefixtures("server")
+def test_terms_match_by_stem() -> None:
+    """Terms match other forms of the same word."""
+    get_puzzle_page(2016, 1)
+    assert search("helping")
+    assert search("contain")
+    assert not search("synthetic unicorns")
+
+
+@pytest.mark.usefixtures("cache")
+def test_query_syntax_is_quoted() -> None:
+    """Punctuation in the terms isn't read as query syntax."""
+    assert search('day-1 "quoted" OR (x') == []
+    assert search("   ") == []
+
+
+def test_cached_pages_are_indexed(cache: Path) -> None:
+    """Pages cached without indexing, or changed since, are indexed on search."""
+    folder = cache / "default/2015/07"
+    folder.mkdir(parents=True)
+    (folder / "index.html").write_text(page(2015, 7))
+    assert index_cached_pages() == 1
+    assert index_cached_pages() == 0
+    assert [(hit.year, hit.day) for hit in search("puzzle 7")][:1] == [(2015, 7)]
@@ -0,0 +1,64 @@
+"""Tests for the cycle detecting simulation."""
+import pytest
+
+from advent.lib.simulate import fingerprint, simulate
+
+
+def _brute_force(start: int, iterations: int, modulus: int) -> int:
+    """Run the simulation step by step."""
+    state = start
+    for _ in range(iterations):
+        state = (state * state + 1) % modulus
+    return state
+
+
+@pytest.mark.parametrize("iterations", [0, 1, 5, 17, 100, 1000, 12345])
+@pytest.mark.parametrize(("start", "modulus"), [(0, 1), (3, 97), (2, 1009)])
+def test_matches_brute_force(iterations: int, start: int, modulus: int) -> None:
+    """Skipping whole cycles gives the same state as stepping every time."""
+    simulation = simulate(lambda x: (x * x + 1) % modulus, start, iterations)
+    assert simulation.state == _brute_force(start, iterations, modulus)
+    assert simulation.steps <= iterations
+
+
+def test_skips_ahead() -> None:
+    """A long simulation only steps until the cycle is found."""
+    steps = []
+
+    def step(state: int) -> int:
+        steps.append(state)
+        return (state + 1) % 7
+
+    simulation = simulate(step, 0, 10**12)
+    assert simulation.cycle_length == 7
+    assert simulation.state == 10**12 % 7
+    assert len(steps) < 30
+
+
+def test_no_cycle() -> None:
+    """Without a repeated state, every iteration is run."""
+    simulation = simulate(lambda x: x + 1, 0, 100)
+    assert (simulation.state, simulation.steps, simulation.cycle_length) == (
+        100,
+        100,
+        None,
+    )
+
+
+def test_unhashable_states() -> None:
+    """States which aren't hashable are fingerprinted by their contents."""
+    assert fingerprint([1, 2]) == fingerprint([1, 2])
+    assert fingerprint([1, 2]) != fingerprint([2, 1])
+    simulation = simulate(lambda x: [(x[0] + 1) % 3], [0], 10, verify=True)
+    assert simulation.state == [1]
+    assert simulation.cycle_length == 3
+
+
+def test_verified_array_states() -> None:
+    """NumPy array states are compared as a whole when verified."""
+    numpy = pytest.importorskip("numpy")
+    simulation = simulate(
+        lambda a: numpy.roll(a, 1), numpy.arange(5), 10**9, verify=True
+    )
+    assert simulation.state.tolist() == [0, 1, 2, 3, 4]
+    assert simulation.cycle_length == 5